@@ -3,7 +3,7 @@ import streamlit as st
 import pandas as pd
 
 from src.constants import LOGO_HTML, set_page_config
-from src.utils.session_state import init_session_state
+from src.utils.session_state import init_session_state, get_store
 from src.components.environment import (
     add_environment_dialog,
     edit_environment_dialog,
@@ -12,12 +12,44 @@ from src.components.environment import (
 from src.components.project import (
     add_project_dialog,
     edit_project_dialog,
-    delete_project_dialog
+    delete_project_dialog,
+    bulk_import_dialog
 )
 from src.components.stack import stack_dialog
+from src.components.manual import render_manual
+from src.components.workflow_options import workflow_options
+from src.components.diagnostics import render_diagnostics
+from src.utils.timing import collect_spans, span
 from src.workflow_generator.workflows import WorkflowGenerator
 
 
+def build_project_table(project_mapping: pd.DataFrame, env_names) -> pd.DataFrame:
+    """
+    Build the project table for display with column-wise operations only.
+
+    Returns a new frame with `project_name` and `{env}_project`/`{env}_url` columns; the session mapping is
+    left untouched.
+    """
+    if 'project_name' not in project_mapping.columns:
+        project_mapping = pd.DataFrame(columns=['project_name'])
+    table = project_mapping[['project_name']].copy()
+
+    for env_name in env_names:
+        name_col = f'{env_name}_kbc_project_name'
+        id_col = f'{env_name}_projectId'
+        url_col = f'{env_name}_url'
+
+        # Label "<name> (<id>)", ids may come back as floats ("123.0") after a concat with missing values
+        if name_col in project_mapping.columns and id_col in project_mapping.columns:
+            project_ids = project_mapping[id_col].astype(str).str.split('.', n=1).str[0]
+            table[f'{env_name}_project'] = project_mapping[name_col].astype(str) + ' (' + project_ids + ')'
+        else:
+            table[f'{env_name}_project'] = "⚠️ Configuration needed"
+
+        table[url_col] = project_mapping[url_col] if url_col in project_mapping.columns else None
+    return table
+
+
 def main():
     # Set page configuration
     set_page_config()
@@ -27,6 +59,7 @@ def main():
 
     # Initialize session state
     init_session_state()
+    store = get_store()
 
     # Setup Git
     st.markdown('---')
@@ -51,7 +84,7 @@ def main():
 
     # Display environments
     st.dataframe(
-        st.session_state['environments'],
+        store.environments_frame(),
         column_config={
             'env_name': 'Environment Name',
             'branch': 'Branch'
@@ -81,10 +114,12 @@ def main():
         edit_project_dialog()
     if col3.button('➖ Delete a project', use_container_width=True):
         delete_project_dialog()
+    if st.button('⇪ Bulk import projects from CSV/JSON', use_container_width=True):
+        bulk_import_dialog()
 
     # Project table display
-    df = pd.DataFrame(columns=['project_name']) if st.session_state['project_mapping'].empty else st.session_state[
-        'project_mapping']
+    env_names = store.environment_names()
+    df = store.cached_view('project_table', lambda: build_project_table(store.mapping_frame(), env_names))
 
     # Basic column configuration
     columns = ['project_name']
@@ -93,61 +128,20 @@ def main():
     }
 
     # Add columns for each environment
-    if 'environments' in st.session_state and not st.session_state['environments'].empty:
-        for env_name in st.session_state['environments']['env_name'].unique():
-            # Add project name column
-            project_col = f'{env_name}_project'
-            columns.append(project_col)
-
-            # Initialize project column if not exists
-            if project_col not in df.columns:
-                df[project_col] = None
-
-            # Add project URL column
-            url_col = f'{env_name}_url'
-            columns.append(url_col)
-
-            # Initialize URL column if not exists
-            if url_col not in df.columns:
-                df[url_col] = None
-
-            if not df.empty:
-                # Update project name column
-                df[project_col] = df.apply(
-                    lambda row: (
-                        f"{row[f'{env_name}_kbc_project_name']} ({str(row[f'{env_name}_projectId']).split('.')[0]})"
-                        if all(f'{env_name}_{key}' in row.index for key in ['kbc_project_name', 'projectId'])
-                        else "⚠️ Configuration needed"
-                    ),
-                    axis=1
-                )
-
-                # Update URL column
-                df[url_col] = df.apply(
-                    lambda row: row[f'{env_name}_url'] if f'{env_name}_url' in row.index else None,
-                    axis=1
-                )
-
-                # Update branchId from environment configuration
-                branch_id_col = f'{env_name}_branchId'
-
-                if not df.empty:
-                    df[branch_id_col] = df.apply(
-                        lambda row: row.get(f'{env_name}_branchId', '0'),  # Použijeme přímo uložené branchId
-                        axis=1
-                    )
-                else:
-                    df[branch_id_col] = '0'
-
-            # Configure columns
-            column_config[project_col] = st.column_config.TextColumn(
-                f"Keboola Project ({env_name})",
-                help=f"Project name and ID for {env_name} environment"
-            )
-            column_config[url_col] = st.column_config.LinkColumn(
-                f"Keboola Project ({env_name}) Link",
-                help=f"Project URL for {env_name} environment"
-            )
+    for env_name in env_names:
+        project_col = f'{env_name}_project'
+        url_col = f'{env_name}_url'
+        columns.extend([project_col, url_col])
+
+        # Configure columns
+        column_config[project_col] = st.column_config.TextColumn(
+            f"Keboola Project ({env_name})",
+            help=f"Project name and ID for {env_name} environment"
+        )
+        column_config[url_col] = st.column_config.LinkColumn(
+            f"Keboola Project ({env_name}) Link",
+            help=f"Project URL for {env_name} environment"
+        )
 
     # Display the table
     st.dataframe(
@@ -157,33 +151,34 @@ def main():
         hide_index=True
     )
 
-    if (len(st.session_state['project_mapping']) > 0 and
-            len(st.session_state['environments']) > 0):
+    if len(store) > 0 and len(env_names) > 0:
         # Generate workflow
         st.divider()
         st.subheader('Generated CI/CD Workflow')
+        options = workflow_options()
 
         generator = WorkflowGenerator(
             str(Path(__file__).parent),
             scm_platform,
             st.session_state['stack'],
-            st.session_state['environments'].to_dict(orient='records'),
-            st.session_state['project_mapping'].to_dict(orient='records')
+            store.environment_records(),
+            store.mapping_records(),
+            options
         )
 
-        st.session_state['zip_path'], st.session_state['zip_file_name'] = generator.get_zip_file()
-        st.session_state['manual'] = generator.get_manual()
-
-        if 'zip_path' in st.session_state and 'manual' in st.session_state:
-            with open(st.session_state['zip_path'], "rb") as file:
-                st.download_button(
-                    label=f"Download {scm_platform} CI/CD workflow",
-                    data=file,
-                    file_name=st.session_state['zip_file_name'],
-                    mime="application/zip"
-                )
+        st.session_state['zip_bytes'] = generator.get_zip_bytes()
+        st.session_state['zip_file_name'] = generator.get_zip_file_name()
+        st.session_state['manual'] = generator.get_manual_sections()
+
+        if 'zip_bytes' in st.session_state and 'manual' in st.session_state:
+            st.download_button(
+                label=f"Download {scm_platform} CI/CD workflow",
+                data=st.session_state['zip_bytes'],
+                file_name=st.session_state['zip_file_name'],
+                mime="application/zip"
+            )
             st.markdown(f"# Setup Instructions ({scm_platform}):")
-            st.markdown(st.session_state['manual'], unsafe_allow_html=True)
+            render_manual(st.session_state['manual'])
             # Add some spacing at the bottom of the page
             st.write("")
             st.write("")
@@ -193,4 +188,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with collect_spans() as spans:
+        with span('app.rerun'):
+            main()
+    render_diagnostics(spans)
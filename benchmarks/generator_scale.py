@@ -0,0 +1,168 @@
+"""
+Scale benchmark: times each stage of the GitHub generator pipeline over a grid of project and environment
+counts and writes the results as JSON.
+
+    python -m benchmarks.generator_scale --output scale.json
+    python -m benchmarks.generator_scale --output scale.json --compare baseline.json --max-regression 1.5
+
+Stages are measured separately with the render caches cleared, so every repetition does the full work:
+`transform_mapping`, `generate_steps`, `render` (workflow templates), `zip` and `manual`. For each stage the
+median and minimum wall time, the tracemalloc peak and the output size are recorded.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.synthetic import STACK, make_environments, make_project_mapping
+from src.workflow_generator.base import workflow_generator
+from src.workflow_generator.github.assets import get_assets
+from src.workflow_generator.github.github_generator import GithubGenerator
+
+ROOT_PATH = str(Path(__file__).resolve().parent.parent)
+DEFAULT_PROJECTS = [1, 10, 100, 1000]
+DEFAULT_ENVIRONMENTS = [1, 5, 20]
+
+
+def _clear_caches():
+    workflow_generator._render_cache.clear()
+    workflow_generator._zip_cache.clear()
+
+
+def _size(output) -> int:
+    if isinstance(output, (str, bytes)):
+        return len(output)
+    if isinstance(output, dict):
+        return len(json.dumps(output))
+    if isinstance(output, list) and output and isinstance(output[0], tuple):
+        # Rendered (archive path, content) pairs
+        return sum(len(content) for _, content in output)
+    return len(json.dumps(output))
+
+
+def _stages(project_count: int, env_count: int):
+    """(stage name, callable) pairs; the generator is built once and every stage reruns its own work."""
+    environments = make_environments(env_count)
+    project_mapping = make_project_mapping(project_count, environments)
+    generator = GithubGenerator(ROOT_PATH, STACK, environments, project_mapping)
+    base_zip = get_assets(ROOT_PATH).base_zip
+    rendered = generator._generate()
+
+    return [
+        ('transform_mapping', lambda: generator._transform_mapping(project_mapping)),
+        ('generate_steps', generator._generate_steps),
+        ('render', generator._generate),
+        ('zip', lambda: GithubGenerator._append_to_zip_bytes(base_zip, rendered)),
+        ('manual', generator.get_manual),
+    ]
+
+
+def _measure(stage, repeat: int) -> dict:
+    timings = []
+    output = None
+    for _ in range(repeat):
+        _clear_caches()
+        start = time.perf_counter()
+        output = stage()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Peak memory in a separate run, tracing slows the timed runs down
+    _clear_caches()
+    tracemalloc.start()
+    stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'peak_kb': round(peak / 1024, 1),
+        'output_bytes': _size(output),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_PATH, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run(projects, environments, repeat: int) -> dict:
+    # Load the static assets and compile the templates up front; they are process-wide one-off costs
+    get_assets(ROOT_PATH)
+    GithubGenerator(ROOT_PATH, STACK, make_environments(1), make_project_mapping(1, make_environments(1)))._generate()
+
+    results = []
+    for project_count in projects:
+        for env_count in environments:
+            for stage_name, stage in _stages(project_count, env_count):
+                result = {'projects': project_count, 'environments': env_count, 'stage': stage_name}
+                result.update(_measure(stage, repeat))
+                results.append(result)
+                print(f"{project_count:>5} projects {env_count:>3} envs  {stage_name:<18}"
+                      f"{result['median_ms']:>10.2f} ms {result['peak_kb']:>10.1f} KB peak "
+                      f"{result['output_bytes']:>10} B")
+    return {
+        'commit': _git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float = None) -> int:
+    """Print the median time ratios against `baseline`; returns the number of stages over `max_regression`."""
+    baseline_results = {(r['projects'], r['environments'], r['stage']): r for r in baseline['results']}
+    regressions = 0
+    print(f"\ncompared with {baseline.get('commit', '')[:12] or 'baseline'}:")
+    for result in report['results']:
+        before = baseline_results.get((result['projects'], result['environments'], result['stage']))
+        if before is None or before['median_ms'] <= 0:
+            continue
+        ratio = result['median_ms'] / before['median_ms']
+        flag = ''
+        if max_regression is not None and ratio > max_regression:
+            regressions += 1
+            flag = '  REGRESSION'
+        print(f"{result['projects']:>5} projects {result['environments']:>3} envs  {result['stage']:<18}"
+              f"{before['median_ms']:>10.2f} -> {result['median_ms']:.2f} ms ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generator pipeline scale benchmark')
+    parser.add_argument('--projects', type=int, nargs='+', default=DEFAULT_PROJECTS)
+    parser.add_argument('--environments', type=int, nargs='+', default=DEFAULT_ENVIRONMENTS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON written by an earlier run')
+    parser.add_argument('--max-regression', type=float, default=None,
+                        help='Fail if a stage is slower than the baseline by more than this factor')
+    args = parser.parse_args()
+
+    report = run(args.projects, args.environments, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'results written to {args.output}')
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.max_regression):
+            print('FAILED: stages slower than the baseline')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Soak benchmark: runs thousands of generations and fails if the traced heap, resident memory (RSS) or object
+counts keep growing.
+
+    python -m benchmarks.generator_soak --iterations 2000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import STACK, make_environments, make_project_mapping
+from src.workflow_generator.github.github_generator import GithubGenerator
+from src.workflow_generator.workflows import WorkflowGenerator, GITHUB_KEY
+
+ROOT_PATH = str(Path(__file__).resolve().parent.parent)
+
+
+def _rss_kb() -> int:
+    # Current resident set size (Linux); 0 where /proc is not available
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        return 0
+
+
+def _generate(iteration: int, environments, project_mapping):
+    generator = GithubGenerator(ROOT_PATH, STACK, environments, project_mapping)
+    generator.get_zip_bytes()
+    generator.get_manual()
+    # Distinct configurations, so the bounded artifact cache keeps evicting
+    mapping = make_project_mapping(3, environments, seed=iteration)
+    WorkflowGenerator(ROOT_PATH, GITHUB_KEY, STACK, environments, mapping)
+
+
+def _snapshot():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0], len(gc.get_objects()), _rss_kb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generator memory soak benchmark')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--max-heap-growth-kb', type=int, default=512)
+    parser.add_argument('--max-object-growth', type=int, default=2000)
+    # RSS includes allocator slack and tracemalloc's own bookkeeping, so its bound is looser than the heap's
+    parser.add_argument('--max-rss-growth-kb', type=int, default=4096)
+    args = parser.parse_args()
+
+    environments = make_environments(3)
+    project_mapping = make_project_mapping(10, environments)
+
+    tracemalloc.start()
+    for i in range(args.warmup):
+        _generate(i, environments, project_mapping)
+    heap_start, objects_start, rss_start = _snapshot()
+
+    for i in range(args.warmup, args.warmup + args.iterations):
+        _generate(i, environments, project_mapping)
+    heap_end, objects_end, rss_end = _snapshot()
+    tracemalloc.stop()
+
+    heap_growth_kb = (heap_end - heap_start) // 1024
+    object_growth = objects_end - objects_start
+    rss_growth_kb = rss_end - rss_start
+    print(f'iterations: {args.iterations}')
+    print(f'traced heap: {heap_start // 1024} KB -> {heap_end // 1024} KB ({heap_growth_kb:+d} KB)')
+    print(f'gc objects: {objects_start} -> {objects_end} ({object_growth:+d})')
+    print(f'rss: {rss_start} KB -> {rss_end} KB ({rss_growth_kb:+d} KB)')
+
+    if (heap_growth_kb > args.max_heap_growth_kb or object_growth > args.max_object_growth
+            or rss_growth_kb > args.max_rss_growth_kb):
+        print('FAILED: memory is not flat across generations')
+        return 1
+    print('OK')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
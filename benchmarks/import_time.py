@@ -0,0 +1,65 @@
+"""
+Import-time benchmark: fails if importing the generator package is slow or pulls in heavy dependencies.
+
+    python -m benchmarks.import_time --budget-ms 100
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_PATH = str(Path(__file__).resolve().parent.parent)
+MODULE = 'src.workflow_generator.workflows'
+# Must only be imported once they are actually needed
+LAZY_MODULES = ('pandas', 'streamlit', 'jinja2', 'requests')
+
+PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import {MODULE}
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(elapsed_ms)
+print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))
+"""
+
+
+def _measure():
+    # A fresh interpreter per run, so nothing is already imported
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT_PATH, capture_output=True, text=True,
+                            check=True).stdout.splitlines()
+    return float(output[0]), [m for m in output[1].split(',') if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f'Cold import time of {MODULE}')
+    parser.add_argument('--budget-ms', type=float, default=100.0)
+    parser.add_argument('--runs', type=int, default=7)
+    args = parser.parse_args()
+
+    timings = []
+    loaded = set()
+    for _ in range(args.runs):
+        elapsed_ms, modules = _measure()
+        timings.append(elapsed_ms)
+        loaded.update(modules)
+
+    median_ms = statistics.median(timings)
+    print(f'import {MODULE}: median {median_ms:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms '
+          f'(budget {args.budget_ms:.0f} ms)')
+
+    failed = False
+    if loaded:
+        print(f'FAILED: heavy modules imported eagerly: {", ".join(sorted(loaded))}')
+        failed = True
+    if median_ms > args.budget_ms:
+        print('FAILED: import time over budget; run `python -X importtime -c "import '
+              f'{MODULE}"` to find the slow imports')
+        failed = True
+    if not failed:
+        print('OK')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""Synthetic generator inputs shared by the benchmarks."""
+from typing import List, Dict
+
+STACK = 'connection.keboola.com'
+
+
+def make_environments(count: int) -> List[Dict[str, str]]:
+    return [{'env_name': f'env{i}', 'branch': 'main' if i == 0 else f'branch-{i}'} for i in range(count)]
+
+
+def make_project_mapping(project_count: int, environments: List[Dict[str, str]], seed: int = 0) -> List[Dict[str, str]]:
+    """Wide project mapping records, in the shape the app passes to WorkflowGenerator."""
+    mapping = []
+    for p in range(project_count):
+        project = {'project_name': f'PROJECT_{p:04d}'}
+        for e, environment in enumerate(environments):
+            env_name = environment['env_name']
+            project_id = 1000 + p * 100 + e
+            project[f'{env_name}_token'] = f'{project_id}-token-{seed}'
+            project[f'{env_name}_projectId'] = str(project_id)
+            project[f'{env_name}_kbc_project_name'] = f'Project {p} ({env_name})'
+            project[f'{env_name}_url'] = f'https://{STACK}/admin/projects/{project_id}'
+            project[f'{env_name}_branch'] = 'Main'
+            project[f'{env_name}_branchId'] = str(project_id * 10)
+        mapping.append(project)
+    return mapping
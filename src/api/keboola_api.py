@@ -1,46 +1,110 @@
-import requests
-from typing import Optional, Tuple, List, Dict, Any
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Tuple, List, Dict, Any, Iterator, Hashable
 
-def validate_token(stack: str, token: str) -> Optional[Tuple[str, str, str, List[Dict[str, Any]]]]:
+from .keboola_client import KeboolaClient
+from ..utils.timing import span, propagate_context
+from ..utils.ttl_cache import TTLCache
+
+VALIDATION_CACHE_TTL = 300
+VALIDATION_CACHE_SIZE = 512
+VALIDATION_MAX_WORKERS = 8
+
+# Successful validations keyed by (stack, sha256(token)), shared across reruns and sessions
+_validation_cache = TTLCache(max_size=VALIDATION_CACHE_SIZE, ttl=VALIDATION_CACHE_TTL)
+
+
+def _cache_key(stack: str, token: str) -> Tuple[str, str]:
+    return stack, hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def invalidate_token_cache(stack: str, token: Optional[str] = None):
+    """Drop the cached validation for a token, or the whole cache if no token is given."""
+    if token is None:
+        _validation_cache.clear()
+    else:
+        _validation_cache.invalidate(_cache_key(stack, token))
+
+
+def validate_token(stack: str, token: str,
+                   force_refresh: bool = False) -> Optional[Tuple[str, str, str, List[Dict[str, Any]]]]:
     """
     Validate Keboola API token and return project details.
-    
+
+    Token verification and the branch listing are fetched concurrently over the shared connection pool.
+    Successful results are cached for `VALIDATION_CACHE_TTL` seconds; `force_refresh` bypasses the cache.
+
     Returns:
         Tuple of (project_id, kbc_project_name, project_link, project_branches) or None if validation fails
     """
-    header = {'X-StorageApi-Token': token}
-    url = f'https://{stack}/v2/storage/tokens/verify'
-    
+    with span('keboola.validate_token', cache_hit=False) as fields:
+        key = _cache_key(stack, token)
+        if not force_refresh:
+            cached = _validation_cache.get(key)
+            if cached is not None:
+                fields['cache_hit'] = True
+                return cached
+
+        result = _fetch_project_details(stack, token)
+        fields['valid'] = result is not None
+        if result is None:
+            _validation_cache.invalidate(key)
+        else:
+            _validation_cache.set(key, result)
+        return result
+
+
+def validate_tokens(stack: str, tokens: Dict[Hashable, str], force_refresh: bool = False,
+                    max_workers: int = VALIDATION_MAX_WORKERS
+                    ) -> Iterator[Tuple[Hashable, Optional[Tuple[str, str, str, List[Dict[str, Any]]]]]]:
+    """
+    Validate several tokens concurrently.
+
+    Yields (key, validation result) pairs in completion order, so the slowest token bounds the latency.
+    A failure of one token never affects the others; it is reported as a None result.
+    """
+    if not tokens:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tokens)), thread_name_prefix='validate-token') as pool:
+        futures = {pool.submit(propagate_context(validate_token), stack, token, force_refresh): key
+                   for key, token in tokens.items()}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception:
+                result = None
+            yield futures[future], result
+
+
+def _fetch_project_details(stack: str, token: str) -> Optional[Tuple[str, str, str, List[Dict[str, Any]]]]:
+    client = KeboolaClient(stack, token)
+
     try:
-        response = requests.get(url, headers=header)
-        if response.status_code == 200:
-            project_id = response.json().get('owner', {}).get('id')
-            kbc_project_name = response.json().get('owner', {}).get('name')
-            project_link = f'https://{stack}/admin/projects/{project_id}'
-            project_branches = get_branches(stack, token)
-            return project_id, kbc_project_name, project_link, project_branches
+        token_details, branches = client.verify_token_with_branches()
     except Exception:
         return None
-    
-    return None
+
+    project_id = token_details.get('owner', {}).get('id')
+    kbc_project_name = token_details.get('owner', {}).get('name')
+    project_link = f'{client.base_url}/admin/projects/{project_id}'
+    project_branches = _format_branches(branches)
+    return project_id, kbc_project_name, project_link, project_branches
+
 
 def get_branches(stack: str, token: str) -> List[Dict[str, Any]]:
     """Get available branches for a project."""
-    headers = {'X-StorageApi-Token': token}
-    url = f'https://{stack}/v2/storage/dev-branches/'
-    
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return [
-                {
-                    'id': branch.get('id'),
-                    'name': branch.get('name'),
-                    'isDefault': branch.get('isDefault')
-                }
-                for branch in response.json()
-            ]
+        return _format_branches(KeboolaClient(stack, token).get_branches())
     except Exception:
         return []
-    
-    return []
+
+
+def _format_branches(branches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            'id': branch.get('id'),
+            'name': branch.get('name'),
+            'isDefault': branch.get('isDefault')
+        }
+        for branch in branches
+    ]
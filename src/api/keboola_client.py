@@ -0,0 +1,133 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, List, Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..utils.timing import span, propagate_context
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (3.05, 15)
+DEFAULT_POOL_SIZE = 16
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+_shared_executor: Optional[ThreadPoolExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE,
+                   retries: int = DEFAULT_RETRIES,
+                   backoff_factor: float = DEFAULT_BACKOFF_FACTOR) -> requests.Session:
+    """
+    Create a keep-alive session with a connection pool and retry with backoff on 429/5xx.
+
+    Only idempotent requests are retried; `Retry-After` headers are respected.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_shared_session() -> requests.Session:
+    """Return the process-wide session, so that all clients share one connection pool."""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = create_session()
+    return _shared_session
+
+
+def _get_shared_executor() -> ThreadPoolExecutor:
+    global _shared_executor
+    if _shared_executor is None:
+        with _shared_executor_lock:
+            if _shared_executor is None:
+                _shared_executor = ThreadPoolExecutor(max_workers=DEFAULT_POOL_SIZE,
+                                                      thread_name_prefix='keboola-api')
+    return _shared_executor
+
+
+class KeboolaClient:
+    """
+    Storage API client bound to a stack and a token.
+
+    All instances share one pooled session by default, so TLS connections are reused
+    across calls, tokens and Streamlit reruns.
+    """
+
+    def __init__(self, stack: str, token: str, session: Optional[requests.Session] = None,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT):
+        self._base = self._base_uni(stack)
+        self._head = {'X-StorageApi-Token': token}
+        self._session = session or get_shared_session()
+        self._timeout = timeout
+
+    @property
+    def base_url(self) -> str:
+        return self._base
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+
+    @staticmethod
+    def _base_uni(host: str) -> str:
+        host = host.rstrip('/')
+        if not host.startswith('https://') and not host.startswith('http://'):
+            return ''.join(['https://', host])
+        return host
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None, base: Optional[str] = None) -> Any:
+        """GET `path` relative to the stack (or `base`) and return the decoded JSON body."""
+        with span('keboola.http_get', path=path) as fields:
+            response = self._session.get(url=''.join([base or self._base, path]), headers=self._head,
+                                         params=params, timeout=self._timeout)
+            fields['status'] = response.status_code
+            response.raise_for_status()
+            return response.json()
+
+    def verify_token(self) -> Dict[str, Any]:
+        return self.get('/v2/storage/tokens/verify')
+
+    def get_branches(self) -> List[Dict[str, Any]]:
+        return self.get('/v2/storage/dev-branches/')
+
+    def _get_branches_or_empty(self) -> List[Dict[str, Any]]:
+        try:
+            return self.get_branches()
+        except Exception:
+            return []
+
+    def verify_token_with_branches(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Fetch token details and branches concurrently.
+
+        A failed branch listing does not invalidate the token, the branches are then empty.
+        """
+        branches_future = _get_shared_executor().submit(propagate_context(self._get_branches_or_empty))
+        try:
+            token_details = self.verify_token()
+        except Exception:
+            branches_future.cancel()
+            raise
+        return token_details, branches_future.result()
@@ -0,0 +1,22 @@
+import streamlit as st
+from ..utils.timing import percentiles
+
+
+def render_diagnostics(spans):
+    """Optional sidebar panel with the timing spans of this rerun and rolling percentiles of all reruns."""
+    if not st.sidebar.toggle('Show diagnostics', key='show_diagnostics',
+                             help='Timing of API calls, template rendering, zipping and the manual'):
+        return
+
+    with st.sidebar:
+        st.subheader('Diagnostics')
+        rerun = [record for record in spans if record.name == 'app.rerun']
+        if rerun:
+            st.caption(f'Last rerun: {rerun[-1].duration_ms:.1f} ms')
+
+        st.markdown('**This rerun**')
+        st.dataframe([record.as_dict() for record in spans if record.name != 'app.rerun'],
+                     use_container_width=True, hide_index=True)
+
+        st.markdown('**Rolling percentiles (ms)**')
+        st.dataframe(percentiles(), use_container_width=True, hide_index=True)
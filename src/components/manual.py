@@ -0,0 +1,21 @@
+import streamlit as st
+from ..workflow_generator.base.manual import ImageSection, TableSection
+
+
+def render_manual(sections):
+    """
+    Render the setup manual sections.
+
+    Images are served as static media files instead of inline base64 and the secrets/variables tables
+    are shown per environment in virtualized dataframes, so the page stays small for large fleets.
+    """
+    for section in sections:
+        if isinstance(section, ImageSection):
+            st.image(section.path, width=section.width)
+        elif isinstance(section, TableSection):
+            env_names = list(section.rows_by_env)
+            for tab, env_name in zip(st.tabs(env_names), env_names):
+                with tab:
+                    st.dataframe(section.records(env_name), use_container_width=True, hide_index=True)
+        else:
+            st.markdown(section.to_markdown())
@@ -1,7 +1,16 @@
+import hashlib
+
 import streamlit as st
-import pandas as pd
-from ..api.keboola_api import validate_token
-from ..utils.session_state import update_project
+from ..api.keboola_api import validate_tokens
+from ..models.project_store import Binding, Project
+from ..utils.project_import import parse_project_import
+from ..utils.session_state import get_store
+
+# Concurrent token validations of a bulk import
+BULK_VALIDATION_MAX_WORKERS = 8
+
+DEPENDS_ON_HELP = ('Projects pushed before this one, e.g. producers of the shared buckets it uses. '
+                   'Used by the parallel push of the generated workflow.')
 
 
 def format_branch_options(branches):
@@ -19,98 +28,135 @@ def format_branch_options(branches):
     return [default_branch] + other_branches if default_branch else other_branches
 
 
-def validate_and_display_project(env_name: str, token: str):
-    """Validate token and display project details."""
-    with st.spinner(f'Validating token for {env_name}...'):
-        validation_result = validate_token(st.session_state['stack'], token)
-        if validation_result:
-            project_id, kbc_project_name, project_url, project_branches = validation_result
-
-            with st.success(f"""
-                **Project Details:**
-                - ID: {project_id}
-                - Name: {kbc_project_name}
-                - Link: {project_url}
-            """):
-                pass
-
-            if project_branches:
-                branch_names = format_branch_options(project_branches)
-                return {
-                    'project_id': project_id,
-                    'kbc_project_name': kbc_project_name,
-                    'project_url': project_url,
-                    'branch_names': branch_names,
-                    'branches': project_branches
-                }
-    return None
+def validate_and_display_projects(tokens: dict, placeholders: dict, force_refresh: bool = False) -> dict:
+    """
+    Validate the tokens of all environments concurrently and display project details as they arrive.
+
+    Args:
+        tokens: env_name -> token, only environments with an entered token
+        placeholders: env_name -> st.empty() slot where the result of that environment is rendered
+        force_refresh: bypass the validation cache
+
+    Returns:
+        env_name -> project details for the environments whose token is valid
+    """
+    for env_name in tokens:
+        placeholders[env_name].info(f'Validating token for {env_name}...')
+
+    validated_projects = {}
+    for env_name, validation_result in validate_tokens(st.session_state['stack'], tokens, force_refresh):
+        if not validation_result:
+            placeholders[env_name].error(f'Token validation for {env_name} failed')
+            continue
+
+        project_id, kbc_project_name, project_url, project_branches = validation_result
+        placeholders[env_name].success(f"""
+            **Project Details:**
+            - ID: {project_id}
+            - Name: {kbc_project_name}
+            - Link: {project_url}
+        """)
+
+        project_details = get_project_details(validation_result)
+        if project_details:
+            validated_projects[env_name] = project_details
+    return validated_projects
+
+
+def get_project_details(validation_result):
+    """Project details of a successful validation, None if the token is invalid or the project has no branches."""
+    if not validation_result:
+        return None
+
+    project_id, kbc_project_name, project_url, project_branches = validation_result
+    if not project_branches:
+        return None
+    return {
+        'project_id': project_id,
+        'kbc_project_name': kbc_project_name,
+        'project_url': project_url,
+        'branch_names': format_branch_options(project_branches),
+        'branches': project_branches
+    }
+
+
+def create_binding(token: str, project_details: dict, selected_branch: tuple) -> Binding:
+    """Binding of a project to the validated Keboola project and the selected branch."""
+    branch_name, _, branch_id = selected_branch
+    return Binding(
+        token=token,
+        project_id=str(project_details['project_id']),
+        kbc_project_name=project_details['kbc_project_name'],
+        url=project_details['project_url'],
+        branch=branch_name,
+        branch_id=str(branch_id)
+    )
 
 
 @st.dialog('Add a new project', width='large')
 def add_project_dialog():
     """Dialog for adding a new project."""
-    if 'environments' not in st.session_state or st.session_state['environments'].empty:
+    store = get_store()
+    if not store.environment_names():
         st.info("Please setup environments first")
         return
     if 'stack' not in st.session_state:
         st.info("Please select a stack first")
         return
 
-    env_names = st.session_state['environments']['env_name'].unique()
+    env_names = store.environment_names()
     project_name = st.text_input('Project Name',
                                  help='Create a name for the project group will be used as folders in VCS for your '
                                       'Keboola project sources').upper()
+    depends_on = st.multiselect('Depends on', options=store.project_names(), key='depends_on',
+                                help=DEPENDS_ON_HELP)
+    force_refresh = st.button('↻ Refresh validation', key='refresh_validation',
+                              help='Validate the tokens again instead of using the cached results')
 
     tokens = {}
-    validated_projects = {}
+    env_containers = {}
+    result_placeholders = {}
     selected_branches = {}
-    all_fields_valid = True
 
     for env_name in env_names:
-        st.subheader(f'{env_name}',help='Your defined environment')
-        tokens[env_name] = st.text_input(f'Token', key=f'token_{env_name}', help='Keboola Storage token: https://help.keboola.com/management/project/tokens/#refreshing-token') # noqa
+        env_container = st.container()
+        env_container.subheader(f'{env_name}',help='Your defined environment')
+        tokens[env_name] = env_container.text_input(f'Token', key=f'token_{env_name}', help='Keboola Storage token: https://help.keboola.com/management/project/tokens/#refreshing-token') # noqa
+        result_placeholders[env_name] = env_container.empty()
+        env_containers[env_name] = env_container
 
-        if not tokens[env_name]:
-            all_fields_valid = False
-            continue
-
-        project_details = validate_and_display_project(env_name, tokens[env_name])
+    entered_tokens = {env_name: token for env_name, token in tokens.items() if token}
+    validated_projects = validate_and_display_projects(entered_tokens, result_placeholders, force_refresh)
+    all_fields_valid = len(validated_projects) == len(env_names)
 
-        if project_details:
-            validated_projects[env_name] = project_details
-            branch_names = project_details['branch_names']
+    for env_name in env_names:
+        project_details = validated_projects.get(env_name)
+        if not project_details:
+            continue
 
-            selected_branch = st.selectbox(
-                f'Select branch for {env_name}',
-                options=branch_names,
-                index=0,
-                key=f'branch_{env_name}',
-                format_func=lambda x: f"{x[0]}{x[1]}",
-                disabled=True
-            )
-            selected_branches[env_name] = selected_branch
-        else:
-            all_fields_valid = False
+        selected_branch = env_containers[env_name].selectbox(
+            f'Select branch for {env_name}',
+            options=project_details['branch_names'],
+            index=0,
+            key=f'branch_{env_name}',
+            format_func=lambda x: f"{x[0]}{x[1]}",
+            disabled=True
+        )
+        selected_branches[env_name] = selected_branch
 
-    if all_fields_valid and project_name and len(selected_branches) == len(env_names):
+    if all_fields_valid and project_name and not store.has_project(project_name) \
+            and len(selected_branches) == len(env_names):
         if st.button('Add Project'):
-            new_row = {'project_name': project_name}
-            for env_name in env_names:
-                project_data = validated_projects[env_name]
-                new_row[f'{env_name}_token'] = tokens[env_name]
-                new_row[f'{env_name}_projectId'] = str(project_data['project_id'])
-                new_row[f'{env_name}_kbc_project_name'] = project_data['kbc_project_name']
-                new_row[f'{env_name}_url'] = project_data['project_url']
-
-                branch_name, _, branch_id = selected_branches[env_name]
-                new_row[f'{env_name}_branch'] = branch_name
-                new_row[f'{env_name}_branchId'] = str(branch_id)
-
-            update_project(new_row)
+            store.add_project(project_name, {
+                env_name: create_binding(tokens[env_name], validated_projects[env_name], selected_branches[env_name])
+                for env_name in env_names
+            }, depends_on=depends_on)
             st.rerun()
     else:
         if not project_name:
             st.warning('Please fill in the project name')
+        elif store.has_project(project_name):
+            st.warning('Project already exists')
         elif not all_fields_valid:
             st.warning('Please ensure all tokens are valid')
         elif len(selected_branches) != len(env_names):
@@ -119,103 +165,103 @@ def add_project_dialog():
 
 @st.dialog('Edit project', width='large')
 def edit_project_dialog():
-    if st.session_state['project_mapping'].empty:
+    store = get_store()
+    if not len(store):
         st.info("No projects to edit")
         return
 
     project_name_to_edit = st.selectbox(
         'Select Project to Edit',
-        options=st.session_state['project_mapping']['project_name'].tolist()
+        options=store.project_names()
     )
 
     st.divider()    
 
     if project_name_to_edit:
-        project_data = st.session_state['project_mapping'][
-            st.session_state['project_mapping']['project_name'] == project_name_to_edit
-            ].iloc[0]
+        project = store.get_project(project_name_to_edit)
 
         new_project_name = st.text_input(
             'New Project Name',
             value=project_name_to_edit,
             help='Update the name of this project'
         )
+        depends_on = st.multiselect(
+            'Depends on',
+            options=[name for name in store.project_names() if name != project_name_to_edit],
+            default=project.depends_on,
+            key=f'edit_depends_on_{project_name_to_edit}',
+            help=DEPENDS_ON_HELP
+        )
+        force_refresh = st.button('↻ Refresh validation', key='edit_refresh_validation',
+                                  help='Validate the tokens again instead of using the cached results')
 
-        env_names = st.session_state['environments']['env_name'].unique()
+        env_names = store.environment_names()
         tokens = {}
-        validated_projects = {}
+        env_containers = {}
+        result_placeholders = {}
         selected_branches = {}
-        all_fields_valid = True
 
         for env_name in env_names:
-            st.subheader(f'{env_name}')
-            tokens[env_name] = st.text_input(
+            env_container = st.container()
+            env_container.subheader(f'{env_name}')
+            tokens[env_name] = env_container.text_input(
                 f'Token',
-                value=project_data.get(f'{env_name}_token', ''),
+                value=project.bindings[env_name].token if env_name in project.bindings else '',
                 key=f'edit_token_{env_name}'
             )
-            st.caption('Keboola Storage token: https://help.keboola.com/management/project/tokens/#refreshing-token')
+            env_container.caption('Keboola Storage token: https://help.keboola.com/management/project/tokens/#refreshing-token')
+            result_placeholders[env_name] = env_container.empty()
+            env_containers[env_name] = env_container
+
+        entered_tokens = {env_name: token for env_name, token in tokens.items() if token}
+        validated_projects = validate_and_display_projects(entered_tokens, result_placeholders, force_refresh)
+        all_fields_valid = len(validated_projects) == len(env_names)
 
-            if not tokens[env_name]:
-                all_fields_valid = False
+        for env_name in env_names:
+            project_details = validated_projects.get(env_name)
+            if not project_details:
                 continue
 
-            project_details = validate_and_display_project(env_name, tokens[env_name])
-
-            if project_details:
-                validated_projects[env_name] = project_details
-                branch_options = format_branch_options(project_details['branches'])
-
-                current_branch_id = project_data.get(f'{env_name}_branchId', '0')
-                current_index = 0
-                for i, (_, _, branch_id) in enumerate(branch_options):
-                    if str(branch_id) == current_branch_id:
-                        current_index = i
-                        break
-
-                selected_branch = st.selectbox(
-                    f'Select branch for {env_name}',
-                    options=branch_options,
-                    index=current_index,
-                    key=f'edit_branch_{env_name}',
-                    format_func=lambda x: f"{x[0]}{x[1]}",
-                    disabled=True
-                )
-                selected_branches[env_name] = selected_branch
-            else:
-                all_fields_valid = False
-
-        if all_fields_valid and len(selected_branches) == len(env_names):
+            branch_options = format_branch_options(project_details['branches'])
+
+            current_branch_id = project.bindings[env_name].branch_id if env_name in project.bindings else '0'
+            current_index = 0
+            for i, (_, _, branch_id) in enumerate(branch_options):
+                if str(branch_id) == current_branch_id:
+                    current_index = i
+                    break
+
+            selected_branch = env_containers[env_name].selectbox(
+                f'Select branch for {env_name}',
+                options=branch_options,
+                index=current_index,
+                key=f'edit_branch_{env_name}',
+                format_func=lambda x: f"{x[0]}{x[1]}",
+                disabled=True
+            )
+            selected_branches[env_name] = selected_branch
+
+        name_taken = new_project_name != project_name_to_edit and store.has_project(new_project_name)
+        if all_fields_valid and new_project_name and not name_taken and len(selected_branches) == len(env_names):
             if st.button('Save Changes'):
-                mask = st.session_state['project_mapping']['project_name'] == project_name_to_edit
-                
-                if new_project_name != project_name_to_edit:
-                    st.session_state['project_mapping'].loc[mask, 'project_name'] = new_project_name
-
-                for env_name in env_names:
-                    project_data = validated_projects[env_name]
-                    selected_branch = selected_branches[env_name]
-                    branch_name, _, branch_id = selected_branch
-
-                    st.session_state['project_mapping'].loc[mask, [
-                        f'{env_name}_token',
-                        f'{env_name}_projectId',
-                        f'{env_name}_kbc_project_name',
-                        f'{env_name}_url',
-                        f'{env_name}_branch',
-                        f'{env_name}_branchId'
-                    ]] = [
-                        tokens[env_name],
-                        str(project_data['project_id']),
-                        project_data['kbc_project_name'],
-                        project_data['project_url'],
-                        branch_name,
-                        str(branch_id)
-                    ]
-                st.success(f'Project "{new_project_name}" updated successfully!')
-                st.rerun()
+                try:
+                    store.update_project(project_name_to_edit, {
+                        env_name: create_binding(tokens[env_name], validated_projects[env_name],
+                                                 selected_branches[env_name])
+                        for env_name in env_names
+                    }, new_name=new_project_name, depends_on=depends_on)
+                except ValueError as e:
+                    # e.g. the dependencies would form a cycle
+                    st.warning(str(e))
+                else:
+                    st.success(f'Project "{new_project_name}" updated successfully!')
+                    st.rerun()
         else:
-            if not all_fields_valid:
+            if not new_project_name:
+                st.warning('Please fill in the project name')
+            elif name_taken:
+                st.warning('Project already exists')
+            elif not all_fields_valid:
                 st.warning('Please ensure all tokens are valid')
             elif len(selected_branches) != len(env_names):
                 st.warning('Please select branches for all environments')
@@ -224,20 +270,123 @@ def edit_project_dialog():
 @st.dialog('Delete project')
 def delete_project_dialog():
     """Dialog for deleting a project."""
-    if st.session_state['project_mapping'].empty:
+    store = get_store()
+    if not len(store):
         st.info("No projects to delete")
         return
 
     name_to_delete = st.selectbox(
         'Select Project to Delete',
-        options=st.session_state['project_mapping']['project_name'].tolist()
+        options=store.project_names()
     )
 
     if name_to_delete:
         st.warning(f"Are you sure you want to delete project '{name_to_delete}'?")
         if st.button('Delete Project'):
-            st.session_state['project_mapping'] = st.session_state['project_mapping'][
-                st.session_state['project_mapping']['project_name'] != name_to_delete
-                ]
+            store.delete_project(name_to_delete)
             st.success(f'Project "{name_to_delete}" deleted successfully!')
             st.rerun()
+
+
+def validate_import_rows(rows, env_names):
+    """
+    Validate the tokens of all imported rows concurrently with bounded parallelism, streaming the progress.
+
+    Every project is bound to the default branch of each environment's Keboola project.
+
+    Returns:
+        Projects ready to be added and the errors of rows that failed validation
+    """
+    tokens = {(i, env_name): row.tokens[env_name] for i, row in enumerate(rows) for env_name in env_names}
+    pending = {i: len(env_names) for i in range(len(rows))}
+    results = {}
+    statuses = []
+
+    progress = st.progress(0.0, text='Validating tokens...')
+    status_table = st.empty()
+    for done, (key, validation_result) in enumerate(
+            validate_tokens(st.session_state['stack'], tokens, max_workers=BULK_VALIDATION_MAX_WORKERS), start=1):
+        results[key] = get_project_details(validation_result)
+        progress.progress(done / len(tokens), text=f'Validated {done}/{len(tokens)} tokens')
+
+        row_index = key[0]
+        pending[row_index] -= 1
+        if pending[row_index] == 0:
+            failed = [env_name for env_name in env_names if not results[(row_index, env_name)]]
+            statuses.append({
+                'Row': rows[row_index].line,
+                'Project': rows[row_index].project_name,
+                'Status': f'⛔ Invalid token for {", ".join(failed)}' if failed else '✅ Valid'
+            })
+            status_table.dataframe(statuses, use_container_width=True, hide_index=True)
+
+    projects, errors = [], []
+    for i, row in enumerate(rows):
+        failed = [env_name for env_name in env_names if not results[(i, env_name)]]
+        if failed:
+            errors.append(f'Row {row.line} ({row.project_name}): invalid token for {", ".join(failed)}')
+            continue
+        projects.append(Project(row.project_name, {
+            env_name: create_binding(row.tokens[env_name], results[(i, env_name)],
+                                     results[(i, env_name)]['branch_names'][0])
+            for env_name in env_names
+        }))
+    return projects, errors
+
+
+@st.dialog('Bulk import projects', width='large')
+def bulk_import_dialog():
+    """Dialog for importing many projects with their tokens from a CSV or JSON file."""
+    store = get_store()
+    if not store.environment_names():
+        st.info("Please setup environments first")
+        return
+    if 'stack' not in st.session_state:
+        st.info("Please select a stack first")
+        return
+
+    env_names = store.environment_names()
+    token_columns = ', '.join(f'`{env_name}_token`' for env_name in env_names)
+    st.caption(f'CSV with the columns `project_name`, {token_columns} or a JSON list of '
+               f'`{{"project_name": ..., "tokens": {{"<environment>": ...}}}}` objects. '
+               f'Projects are bound to the default branch of each Keboola project.')
+    uploaded_file = st.file_uploader('Projects file', type=['csv', 'json'])
+    if not uploaded_file:
+        return
+
+    content = uploaded_file.getvalue()
+    try:
+        rows, errors = parse_project_import(uploaded_file.name, content, env_names)
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f'Could not read the file: {e}')
+        return
+
+    existing = [row for row in rows if store.has_project(row.project_name)]
+    errors.extend(f'Row {row.line}: project "{row.project_name}" already exists' for row in existing)
+    rows = [row for row in rows if not store.has_project(row.project_name)]
+
+    # Validate once per uploaded file, the import button below triggers a rerun
+    import_key = hashlib.sha256(b'|'.join([content, st.session_state['stack'].encode(),
+                                           ','.join(env_names).encode()])).hexdigest()
+    validated = st.session_state.get('bulk_import')
+    if validated is None or validated[0] != import_key:
+        projects, validation_errors = validate_import_rows(rows, env_names) if rows else ([], [])
+        validated = st.session_state['bulk_import'] = (import_key, projects, validation_errors)
+    _, projects, validation_errors = validated
+    errors.extend(validation_errors)
+
+    if errors:
+        st.error('\n'.join(f'- {error}' for error in errors))
+
+    if projects:
+        st.success(f'{len(projects)} projects are valid and ready to be imported')
+        if st.button(f'Import {len(projects)} projects'):
+            try:
+                store.add_projects(projects)
+            except ValueError as e:
+                st.error(str(e))
+                return
+            del st.session_state['bulk_import']
+            st.rerun()
+    else:
+        st.warning('No valid projects to import')
@@ -0,0 +1,49 @@
+import streamlit as st
+from ..workflow_generator.github.github_generator import (
+    DEFAULT_PULL_MAX_PARALLEL,
+    DEFAULT_PUSH_MAX_PARALLEL,
+    MAX_MATRIX_JOBS
+)
+
+
+def workflow_options() -> dict:
+    """Options of the generated workflows, passed to the generator."""
+    with st.expander('Workflow options'):
+        pull_max_parallel = st.number_input(
+            'Max parallel pull jobs',
+            min_value=0,
+            max_value=MAX_MATRIX_JOBS,
+            value=DEFAULT_PULL_MAX_PARALLEL,
+            key='pull_max_parallel',
+            help='Projects are pulled in parallel, one job per project, and committed together. '
+                 '0 runs all project jobs at once.'
+        )
+        push_matrix = st.toggle(
+            'Parallel push',
+            key='push_matrix',
+            help='Push projects in parallel jobs, in waves ordered by the project dependencies '
+                 '(a project is pushed after the projects it depends on). Otherwise all projects are '
+                 'pushed one after another in a single job.'
+        )
+        push_max_parallel = st.number_input(
+            'Max parallel push jobs',
+            min_value=0,
+            max_value=MAX_MATRIX_JOBS,
+            value=DEFAULT_PUSH_MAX_PARALLEL,
+            key='push_max_parallel',
+            disabled=not push_matrix,
+            help='Concurrent push jobs within one wave. 0 runs all jobs of a wave at once.'
+        )
+        cli_version = st.text_input(
+            'Keboola CLI version',
+            key='cli_version',
+            placeholder='latest',
+            help='Pin the Keboola as Code CLI version installed by the workflows (e.g. 2.25.0). When empty, '
+                 'the latest release is resolved once per workflow run. The binary is cached per version.'
+        )
+    return {
+        'cli_version': cli_version,
+        'pull_max_parallel': int(pull_max_parallel),
+        'push_matrix': push_matrix,
+        'push_max_parallel': int(push_max_parallel)
+    }
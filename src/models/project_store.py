@@ -0,0 +1,221 @@
+from typing import Dict, List, Optional, Iterable, Any
+
+from ..utils.dependencies import dependency_waves
+
+# Binding attribute -> suffix of the wide `{env_name}_<suffix>` columns used by views and WorkflowGenerator
+BINDING_COLUMNS = {
+    'token': 'token',
+    'project_id': 'projectId',
+    'kbc_project_name': 'kbc_project_name',
+    'url': 'url',
+    'branch': 'branch',
+    'branch_id': 'branchId'
+}
+
+
+class Environment:
+    __slots__ = ('env_name', 'branch')
+
+    def __init__(self, env_name: str, branch: str):
+        self.env_name = env_name
+        self.branch = branch
+
+
+class Binding:
+    """Keboola project (and its branch) a project is mapped to in one environment."""
+    __slots__ = tuple(BINDING_COLUMNS)
+
+    def __init__(self, token: str, project_id: str, kbc_project_name: str, url: str, branch: str, branch_id: str):
+        self.token = token
+        self.project_id = project_id
+        self.kbc_project_name = kbc_project_name
+        self.url = url
+        self.branch = branch
+        self.branch_id = branch_id
+
+
+class Project:
+    __slots__ = ('name', 'bindings', 'depends_on')
+
+    def __init__(self, name: str, bindings: Optional[Dict[str, Binding]] = None,
+                 depends_on: Optional[Iterable[str]] = None):
+        self.name = name
+        self.bindings: Dict[str, Binding] = dict(bindings or {})
+        # Projects that must be pushed before this one (e.g. producers of its shared buckets)
+        self.depends_on: List[str] = list(depends_on or [])
+
+
+class ProjectStore:
+    """
+    Environments, projects and their per-environment bindings, indexed by environment and project name.
+
+    Inserts, updates, renames and deletes are O(1); insertion order is kept for display. Tabular
+    views (DataFrames, wide records for WorkflowGenerator) are derived on demand and cached until
+    the next mutation.
+    """
+
+    def __init__(self):
+        self._environments: Dict[str, Environment] = {}
+        # internal id -> project keeps insertion order stable across renames
+        self._projects: Dict[int, Project] = {}
+        self._project_ids: Dict[str, int] = {}
+        self._next_project_id = 0
+        self._version = 0
+        self._views: Dict[str, Any] = {}
+
+    @property
+    def version(self) -> int:
+        """Incremented on every change; views are cached per version."""
+        return self._version
+
+    def _changed(self):
+        self._version += 1
+        self._views.clear()
+
+    def cached_view(self, name: str, build):
+        """Return the view `name`, calling `build()` only if the store changed since it was last built."""
+        cached = self._views.get(name)
+        if cached is None:
+            cached = self._views[name] = build()
+        return cached
+
+    # -------------------- ENVIRONMENTS --------------------
+
+    def environment_names(self) -> List[str]:
+        return list(self._environments)
+
+    def has_environment(self, env_name: str) -> bool:
+        return env_name in self._environments
+
+    def get_environment(self, env_name: str) -> Optional[Environment]:
+        return self._environments.get(env_name)
+
+    def add_environment(self, env_name: str, branch: str):
+        if env_name in self._environments:
+            raise ValueError(f"Environment '{env_name}' already exists")
+        self._environments[env_name] = Environment(env_name, branch)
+        self._changed()
+
+    def update_environment(self, env_name: str, branch: str):
+        self._environments[env_name].branch = branch
+        self._changed()
+
+    def delete_environment(self, env_name: str):
+        """Delete the environment together with all project bindings to it."""
+        del self._environments[env_name]
+        for project in self._projects.values():
+            project.bindings.pop(env_name, None)
+        self._changed()
+
+    # -------------------- PROJECTS --------------------
+
+    def __len__(self):
+        return len(self._projects)
+
+    def project_names(self) -> List[str]:
+        return [project.name for project in self._projects.values()]
+
+    def has_project(self, name: str) -> bool:
+        return name in self._project_ids
+
+    def get_project(self, name: str) -> Optional[Project]:
+        project_id = self._project_ids.get(name)
+        return None if project_id is None else self._projects[project_id]
+
+    def add_project(self, name: str, bindings: Dict[str, Binding], depends_on: Optional[Iterable[str]] = None):
+        self.add_projects([Project(name, bindings, depends_on)])
+
+    def add_projects(self, projects: Iterable[Project]):
+        """
+        Add several projects as one change; nothing is added if any name is already taken or the
+        dependencies are unknown or cyclic.
+        """
+        projects = list(projects)
+        seen, duplicates = set(), set()
+        for project in projects:
+            if project.name in self._project_ids or project.name in seen:
+                duplicates.add(project.name)
+            seen.add(project.name)
+        if duplicates:
+            raise ValueError(f"Projects already exist: {', '.join(sorted(duplicates))}")
+        if any(project.depends_on for project in projects):
+            self._check_dependencies({**self._dependencies(), **{p.name: p.depends_on for p in projects}})
+
+        for project in projects:
+            self._projects[self._next_project_id] = project
+            self._project_ids[project.name] = self._next_project_id
+            self._next_project_id += 1
+        self._changed()
+
+    def update_project(self, name: str, bindings: Dict[str, Binding], new_name: Optional[str] = None,
+                       depends_on: Optional[Iterable[str]] = None):
+        """
+        Replace the bindings of a project and optionally rename it (dependents follow the new name)
+        or replace its dependencies.
+        """
+        project_id = self._project_ids[name]
+        if new_name and new_name != name and new_name in self._project_ids:
+            raise ValueError(f"Project '{new_name}' already exists")
+        if depends_on is not None:
+            depends_on = list(depends_on)
+            self._check_dependencies({**self._dependencies(), name: depends_on})
+            self._projects[project_id].depends_on = depends_on
+
+        if new_name and new_name != name:
+            del self._project_ids[name]
+            self._project_ids[new_name] = project_id
+            self._projects[project_id].name = new_name
+            for project in self._projects.values():
+                project.depends_on = [new_name if dependency == name else dependency
+                                      for dependency in project.depends_on]
+        self._projects[project_id].bindings = dict(bindings)
+        self._changed()
+
+    def delete_project(self, name: str):
+        """Delete the project; other projects no longer depend on it."""
+        del self._projects[self._project_ids.pop(name)]
+        for project in self._projects.values():
+            if name in project.depends_on:
+                project.depends_on = [dependency for dependency in project.depends_on if dependency != name]
+        self._changed()
+
+    def _dependencies(self) -> Dict[str, List[str]]:
+        return {project.name: project.depends_on for project in self._projects.values()}
+
+    @staticmethod
+    def _check_dependencies(dependencies: Dict[str, List[str]]):
+        # Raises ValueError for unknown or cyclic dependencies
+        dependency_waves(dependencies, dependencies)
+
+    # -------------------- VIEWS --------------------
+
+    def environment_records(self) -> List[Dict[str, str]]:
+        return self.cached_view('environment_records', lambda: [
+            {'env_name': environment.env_name, 'branch': environment.branch}
+            for environment in self._environments.values()
+        ])
+
+    def mapping_records(self) -> List[Dict[str, Any]]:
+        """Wide records (`project_name` plus `{env_name}_<column>` per binding) as consumed by WorkflowGenerator."""
+        return self.cached_view('mapping_records', self._build_mapping_records)
+
+    def _build_mapping_records(self) -> List[Dict[str, Any]]:
+        records = []
+        for project in self._projects.values():
+            record = {'project_name': project.name}
+            if project.depends_on:
+                record['depends_on'] = list(project.depends_on)
+            for env_name, binding in project.bindings.items():
+                for attribute, column in BINDING_COLUMNS.items():
+                    record[f'{env_name}_{column}'] = getattr(binding, attribute)
+            records.append(record)
+        return records
+
+    def environments_frame(self):
+        import pandas as pd
+        return self.cached_view('environments_frame', lambda: pd.DataFrame(self.environment_records(),
+                                                                     columns=['env_name', 'branch']))
+
+    def mapping_frame(self):
+        import pandas as pd
+        return self.cached_view('mapping_frame', lambda: pd.DataFrame(self.mapping_records()))
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# Directory shared by all worker processes; set to an empty string to disable the store
+ARTIFACT_STORE_DIR_ENV = 'KBC_ARTIFACT_STORE_DIR'
+ARTIFACT_STORE_MAX_BYTES_ENV = 'KBC_ARTIFACT_STORE_MAX_BYTES'
+DEFAULT_ARTIFACT_STORE_DIR = os.path.join(tempfile.gettempdir(), 'kbc_workflow_artifacts')
+DEFAULT_ARTIFACT_STORE_MAX_BYTES = 256 * 1024 * 1024
+
+TEMP_PREFIX = '.tmp-'
+# Temp files older than this are left over from a crashed writer
+STALE_TEMP_SECONDS = 3600
+
+
+class ArtifactStore:
+    """
+    Disk-backed store of generated artifacts keyed by a hex digest of their inputs.
+
+    Safe for concurrent readers and writers across processes: objects are written to a temp file and
+    atomically renamed into place, so a reader sees either the whole artifact or none. Reads refresh the
+    file's mtime, and once the store grows over `max_bytes` the least recently used objects are evicted.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_ARTIFACT_STORE_MAX_BYTES, suffix: str = '.zip'):
+        self._root = Path(root)
+        self._max_bytes = max_bytes
+        self._suffix = suffix
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _path(self, key: str) -> Path:
+        return self._root.joinpath(key[:2], f'{key}{self._suffix}')
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Evicted by another process in the meantime; the data read is still complete
+            pass
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            # mkstemp creates owner-only files; stored artifacts are readable like any other cache file
+            os.chmod(temp_path, 0o644)
+            # Equal keys hold equal bytes, so a concurrent writer of the same key is harmless
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        self.evict()
+
+    def size(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        """(path, mtime, size) of the stored objects; stale temp files are removed on the way."""
+        now = time.time()
+        entries = []
+        for path in self._root.glob('*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.startswith(TEMP_PREFIX):
+                if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                    self._unlink(path)
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def evict(self):
+        """Remove the least recently used objects until the store fits into `max_bytes`."""
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        if total <= self._max_bytes:
+            return
+        for path, _, size in sorted(entries, key=lambda entry: entry[1]):
+            if total <= self._max_bytes:
+                break
+            self._unlink(path)
+            total -= size
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            # Already evicted by another process
+            pass
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+_store_initialized = False
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    """
+    Process-wide artifact store configured by `KBC_ARTIFACT_STORE_DIR` and `KBC_ARTIFACT_STORE_MAX_BYTES`.
+
+    Returns None when the store is disabled or its directory cannot be created. A max size that is not an
+    integer number of bytes falls back to the default size.
+    """
+    global _store, _store_initialized
+    if not _store_initialized:
+        with _store_lock:
+            if not _store_initialized:
+                root = os.environ.get(ARTIFACT_STORE_DIR_ENV, DEFAULT_ARTIFACT_STORE_DIR)
+                try:
+                    max_bytes = int(os.environ.get(ARTIFACT_STORE_MAX_BYTES_ENV, DEFAULT_ARTIFACT_STORE_MAX_BYTES))
+                except ValueError:
+                    # A wrong cache setting must not break generation
+                    max_bytes = DEFAULT_ARTIFACT_STORE_MAX_BYTES
+                try:
+                    _store = ArtifactStore(root, max_bytes) if root else None
+                except OSError:
+                    _store = None
+                _store_initialized = True
+    return _store
@@ -0,0 +1,42 @@
+from typing import Dict, Iterable, List
+
+
+def dependency_waves(names: Iterable[str], depends_on: Dict[str, Iterable[str]]) -> List[List[str]]:
+    """
+    Order `names` into waves: every name comes after all names it depends on, names of one wave do not
+    depend on each other and can be processed in parallel.
+
+    Names keep their given order within a wave.
+
+    Raises:
+        ValueError: a dependency is not one of `names`, or the dependencies form a cycle
+    """
+    names = list(names)
+    known = set(names)
+    remaining: Dict[str, set] = {}
+    dependents: Dict[str, List[str]] = {name: [] for name in names}
+    for name in names:
+        dependencies = set(depends_on.get(name) or ())
+        unknown = dependencies - known
+        if unknown:
+            raise ValueError(f"'{name}' depends on unknown projects: {', '.join(sorted(unknown))}")
+        remaining[name] = dependencies
+        for dependency in dependencies:
+            dependents[dependency].append(name)
+
+    waves = []
+    wave = [name for name in names if not remaining[name]]
+    while wave:
+        waves.append(wave)
+        ready = set()
+        for name in wave:
+            for dependent in dependents[name]:
+                remaining[dependent].discard(name)
+                if not remaining[dependent]:
+                    ready.add(dependent)
+        wave = [name for name in names if name in ready]
+
+    if sum(len(wave) for wave in waves) < len(names):
+        cycle = sorted(name for name in names if remaining[name])
+        raise ValueError(f"Project dependencies form a cycle, unresolved projects: {', '.join(cycle)}")
+    return waves
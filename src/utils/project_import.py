@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from typing import Dict, List, Tuple, Any
+
+TOKEN_COLUMN_SUFFIX = '_token'
+
+
+class ImportRow:
+    """Project to import with its token per environment."""
+    __slots__ = ('line', 'project_name', 'tokens')
+
+    def __init__(self, line: int, project_name: str, tokens: Dict[str, str]):
+        self.line = line
+        self.project_name = project_name
+        self.tokens = tokens
+
+
+def parse_project_import(file_name: str, content: bytes, env_names: List[str]) -> Tuple[List[ImportRow], List[str]]:
+    """
+    Parse a CSV or JSON project list.
+
+    CSV needs a `project_name` column and a `<env_name>_token` column per environment. JSON is a list of
+    either `{"project_name": ..., "tokens": {"<env_name>": ...}}` objects or flat objects with the CSV columns.
+
+    Raises:
+        ValueError: the file is not valid JSON or CSV
+        UnicodeDecodeError: the file is not UTF-8
+
+    Returns:
+        Parsed rows and the errors of rows that could not be parsed (missing name or tokens, duplicate names)
+    """
+    text = content.decode('utf-8-sig')
+    if file_name.lower().endswith('.json'):
+        records = json.loads(text)
+        if not isinstance(records, list):
+            raise ValueError('JSON import must be a list of projects')
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        try:
+            records = list(reader)
+        except csv.Error as e:
+            # line_num counts the lines of the records read so far, the failing record starts on the next one
+            raise ValueError(f'Invalid CSV on line {reader.line_num + 1}: {e}') from e
+
+    rows, errors, seen = [], [], set()
+    for line, record in enumerate(records, start=1):
+        row, error = _parse_record(line, record, env_names)
+        if row and row.project_name in seen:
+            row, error = None, f'Row {line}: duplicate project "{row.project_name}"'
+        if error:
+            errors.append(error)
+            continue
+        seen.add(row.project_name)
+        rows.append(row)
+    return rows, errors
+
+
+def _parse_record(line: int, record: Dict[str, Any], env_names: List[str]):
+    if not isinstance(record, dict):
+        return None, f'Row {line}: expected an object'
+
+    project_name = str(record.get('project_name') or '').strip().upper()
+    if not project_name:
+        return None, f'Row {line}: missing project_name'
+
+    nested_tokens = record.get('tokens') or {}
+    if not isinstance(nested_tokens, dict):
+        return None, f'Row {line} ({project_name}): tokens must be an object of environment name to token'
+    tokens = {}
+    for env_name in env_names:
+        token = nested_tokens.get(env_name) or record.get(f'{env_name}{TOKEN_COLUMN_SUFFIX}')
+        token = str(token or '').strip()
+        if token:
+            tokens[env_name] = token
+
+    missing = [env_name for env_name in env_names if env_name not in tokens]
+    if missing:
+        return None, f'Row {line} ({project_name}): missing token for {", ".join(missing)}'
+    return ImportRow(line, project_name, tokens), None
@@ -0,0 +1,127 @@
+"""
+Lightweight timing spans for the hot paths.
+
+    with span('generator.render', template='KBC_pull_all.yml'):
+        ...
+
+Every finished span is
+- logged as one JSON line on the `kbc.timing` logger (DEBUG level),
+- appended to the spans collected by the innermost `collect_spans()` block of the current context,
+- added to a process-wide rolling window per span name, see `percentiles()`.
+
+Collection follows `contextvars`, so work submitted to a thread pool is attributed to the caller
+when it runs via `propagate_context`.
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger('kbc.timing')
+
+# Durations kept per span name for the rolling percentiles
+WINDOW_SIZE = 500
+PERCENTILES = (50, 90, 99)
+
+_collected: contextvars.ContextVar[Optional[List["SpanRecord"]]] = contextvars.ContextVar('kbc_timing_spans',
+                                                                                         default=None)
+_windows: Dict[str, Deque[float]] = {}
+_windows_lock = threading.Lock()
+
+
+class SpanRecord:
+    __slots__ = ('name', 'duration_ms', 'fields', 'error', 'thread')
+
+    def __init__(self, name: str, duration_ms: float, fields: Dict[str, Any], error: Optional[str], thread: str):
+        self.name = name
+        self.duration_ms = duration_ms
+        self.fields = fields
+        self.error = error
+        self.thread = thread
+
+    def as_dict(self) -> Dict[str, Any]:
+        record = {'span': self.name, 'duration_ms': round(self.duration_ms, 3), 'thread': self.thread}
+        record.update(self.fields)
+        if self.error:
+            record['error'] = self.error
+        return record
+
+
+@contextlib.contextmanager
+def span(name: str, **fields) -> Iterator[Dict[str, Any]]:
+    """
+    Time the enclosed block. Yields the span fields, so the block can add some (e.g. a cache hit flag).
+
+    A raised exception is recorded on the span and re-raised.
+    """
+    error = None
+    start = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _record(SpanRecord(name, (time.perf_counter() - start) * 1000, fields, error,
+                           threading.current_thread().name))
+
+
+def _record(record: SpanRecord):
+    collected = _collected.get()
+    if collected is not None:
+        # list.append is atomic, spans of pool threads can be added concurrently
+        collected.append(record)
+
+    with _windows_lock:
+        window = _windows.get(record.name)
+        if window is None:
+            window = _windows[record.name] = deque(maxlen=WINDOW_SIZE)
+        window.append(record.duration_ms)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(json.dumps(record.as_dict(), default=str))
+
+
+@contextlib.contextmanager
+def collect_spans() -> Iterator[List[SpanRecord]]:
+    """Collect the spans finished in this context (e.g. one Streamlit rerun) into the yielded list."""
+    collected: List[SpanRecord] = []
+    token = _collected.set(collected)
+    try:
+        yield collected
+    finally:
+        _collected.reset(token)
+
+
+def propagate_context(fn: Callable) -> Callable:
+    """Bind `fn` to a copy of the current context, for running it in another thread."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(percentile / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def percentiles() -> List[Dict[str, Any]]:
+    """Rolling count and percentiles (ms) of the last `WINDOW_SIZE` durations per span name."""
+    with _windows_lock:
+        windows = {name: sorted(window) for name, window in _windows.items()}
+    rows = []
+    for name, values in sorted(windows.items()):
+        row = {'span': name, 'count': len(values)}
+        for percentile in PERCENTILES:
+            row[f'p{percentile}_ms'] = round(_percentile(values, percentile), 3)
+        rows.append(row)
+    return rows
+
+
+def reset():
+    """Drop the rolling windows."""
+    with _windows_lock:
+        _windows.clear()
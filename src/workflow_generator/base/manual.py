@@ -0,0 +1,111 @@
+import base64
+import functools
+import os
+import re
+from typing import Dict, List, Tuple, Union
+
+from ...utils.timing import span
+
+# A block placeholder on its own line of a manual template, e.g. "{env_secrets_table}"
+BLOCK_PLACEHOLDER_PATTERN = re.compile(r'^\{(\w+)\}$', flags=re.MULTILINE)
+
+COPY_STYLE = """
+<style>
+.copy-value {
+    user-select: all;
+    cursor: pointer;
+}
+.copy-value:active {
+    background-color: #e0e0e0;
+}
+</style>
+"""
+
+
+class MarkdownSection:
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def to_markdown(self) -> str:
+        return self.text
+
+
+class ImageSection:
+    """An image of the manual; the UI serves it as a static file, the markdown manual inlines it."""
+    __slots__ = ('path', 'alt', 'width')
+
+    def __init__(self, path: str, alt: str, width: int):
+        self.path = path
+        self.alt = alt
+        self.width = width
+
+    def to_markdown(self) -> str:
+        return (f'<p align="center">\n'
+                f'    <img src="data:image/png;base64,{_image_base64(self.path)}" alt="{self.alt}" width="{self.width}">\n'
+                f'</p>')
+
+
+class TableSection:
+    """
+    A two column (name, value) table per environment.
+
+    The UI shows one table per environment, the markdown manual a single table with an Environment column.
+    """
+    __slots__ = ('name_column', 'rows_by_env')
+
+    def __init__(self, name_column: str, rows_by_env: Dict[str, List[Tuple[str, str]]]):
+        self.name_column = name_column
+        self.rows_by_env = rows_by_env
+
+    def records(self, env_name: str) -> List[Dict[str, str]]:
+        return [{self.name_column: name, 'Value': value} for name, value in self.rows_by_env[env_name]]
+
+    def to_markdown(self) -> str:
+        table_elements = [COPY_STYLE,
+                          f"| Environment | {self.name_column} | Value |\n",
+                          "| --- | --- | --- |\n"]
+        for env_name, rows in self.rows_by_env.items():
+            for name, value in rows:
+                table_elements.append(
+                    f"| {env_name} | "
+                    f"<span class='copy-value'>{name}</span> | "
+                    f"<code class='copy-value'>{value}</code> |\n")
+        return ''.join(table_elements)
+
+
+ManualSection = Union[MarkdownSection, ImageSection, TableSection]
+
+
+@functools.lru_cache(maxsize=None)
+def _image_base64(image_path: str) -> str:
+    with span('manual.image_base64', image=os.path.basename(image_path)):
+        with open(image_path, "rb") as img_file:
+            return base64.b64encode(img_file.read()).decode()
+
+
+def split_manual_template(template: str, fields: Dict[str, str],
+                          blocks: Dict[str, ManualSection]) -> List[ManualSection]:
+    """
+    Split a manual template into sections.
+
+    Placeholders standing alone on a line and named in `blocks` become those sections; the text around
+    them is formatted with `fields`.
+    """
+    sections: List[ManualSection] = []
+    position = 0
+    for match in BLOCK_PLACEHOLDER_PATTERN.finditer(template):
+        if match.group(1) not in blocks:
+            continue
+        sections.append(MarkdownSection(template[position:match.start()].format(**fields)))
+        sections.append(blocks[match.group(1)])
+        position = match.end()
+    sections.append(MarkdownSection(template[position:].format(**fields)))
+    return sections
+
+
+def manual_to_markdown(sections: List[ManualSection]) -> str:
+    """The whole manual as one self-contained markdown document (images inlined)."""
+    with span('manual.to_markdown', sections=len(sections)):
+        return ''.join(section.to_markdown() for section in sections)
@@ -1,29 +1,122 @@
 # base.py
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Tuple, Union, Optional, Sequence, TYPE_CHECKING
+from pathlib import Path
+import functools
+import hashlib
+import io
+import json
 import os
-import shutil
-import jinja2
+import posixpath
+import threading
 import zipfile
 
+from ...utils.timing import span
+from ...utils.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    # jinja2 is imported lazily on first render to keep the package import fast
+    import jinja2
+
+# Directories never shipped in generated archives
+IGNORED_DIRS = {'__pycache__'}
+
+# Set to "1"/"true" to re-check template files for changes on every render (development only)
+TEMPLATE_AUTO_RELOAD_ENV = 'KBC_TEMPLATE_AUTO_RELOAD'
+
+# Timestamp of every zip entry (the earliest a zip can store), keeping archives reproducible
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+RENDER_CACHE_SIZE = 256
+ZIP_CACHE_SIZE = 32
+
+# Rendered outputs keyed by (template, digest of the data the output depends on); an edit only
+# re-renders the outputs whose inputs changed
+_render_cache = TTLCache(max_size=RENDER_CACHE_SIZE, ttl=None)
+# Zip archives keyed by the digests of their entries
+_zip_cache = TTLCache(max_size=ZIP_CACHE_SIZE, ttl=None)
+
+_template_environments: Dict[Tuple[str, bool], "jinja2.Environment"] = {}
+_template_environments_lock = threading.Lock()
+
+
+def _auto_reload_enabled() -> bool:
+    return os.environ.get(TEMPLATE_AUTO_RELOAD_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+def _create_bytecode_cache() -> Optional["jinja2.BytecodeCache"]:
+    import jinja2
+    try:
+        return jinja2.FileSystemBytecodeCache()
+    except (OSError, RuntimeError):
+        # e.g. no writable temp directory; compiled templates are still kept in memory
+        return None
+
+
+def get_template_environment(template_dir: str, auto_reload: Optional[bool] = None) -> "jinja2.Environment":
+    """
+    Return the process-wide Jinja environment for `template_dir`.
+
+    The environment is created once and keeps compiled templates in memory, so they are shared
+    across generator instances and sessions; a bytecode cache on disk also spares new processes
+    from compiling them again. Template files are not re-checked unless `auto_reload` is enabled
+    (defaults to the `KBC_TEMPLATE_AUTO_RELOAD` environment variable).
+    """
+    if auto_reload is None:
+        auto_reload = _auto_reload_enabled()
+    key = (os.path.abspath(template_dir), auto_reload)
+
+    environment = _template_environments.get(key)
+    if environment is None:
+        with _template_environments_lock:
+            environment = _template_environments.get(key)
+            if environment is None:
+                import jinja2
+                environment = jinja2.Environment(loader=jinja2.FileSystemLoader(searchpath=template_dir),
+                                                 auto_reload=auto_reload,
+                                                 bytecode_cache=_create_bytecode_cache())
+                _template_environments[key] = environment
+    return environment
+
+
+def data_digest(data: Any) -> str:
+    """Stable digest of JSON-like data; equal data produce equal digests."""
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _file_digest(path: str, mtime_ns: int) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file, computed again only after the file is modified."""
+    return _file_digest(path, os.stat(path).st_mtime_ns)
+
 
 class WorkflowTemplate:
     template_dir: str
     template_file: str
     template_output_dir: str
     filled_file: str
+    # Template data keys the output is rendered from; None means all of them
+    depends_on: Optional[Tuple[str, ...]]
 
-    def __init__(self, template_dir, template_file, template_output_dir, filled_file):
+    def __init__(self, template_dir, template_file, template_output_dir, filled_file,
+                 depends_on: Optional[Sequence[str]] = None):
         self.template_dir = template_dir
         self.template_file = template_file
         self.template_output_dir = template_output_dir
         self.filled_file = filled_file
+        self.depends_on = None if depends_on is None else tuple(depends_on)
 
 
 class WorkflowGeneratorBase:
+    # All state is per instance; nothing is accumulated on the class between generations
     _root_path: str
-    _generated_files = []
     _templates: List[WorkflowTemplate]
-    _template_data = {}
+    _template_data: Dict
     _zip_output_folder: str
     _zip_file_name: str
 
@@ -32,64 +125,150 @@ class WorkflowGeneratorBase:
         self._templates = list_of_templates
         self._template_data = template_data
 
-    def get_zip(self, output_folder: str, zip_file_name: str):
-        # This method should be overridden by subclasses to provide final output folder in zip
+    def get_zip_bytes(self) -> bytes:
+        # This method should be overridden by subclasses to provide the final zip content built in memory
         raise NotImplementedError
 
+    def get_zip_key(self) -> str:
+        # This method should be overridden by subclasses to provide a digest of everything the zip is built from
+        raise NotImplementedError
+
+    def _templates_fingerprint(self) -> List[Tuple[str, str, str]]:
+        """(output file, template file digest, template inputs digest) of every template."""
+        return [(f"{template.template_output_dir}/{template.filled_file}",
+                 file_digest(os.path.join(template.template_dir, template.template_file)),
+                 data_digest(self._template_inputs(template)))
+                for template in self._templates]
+
+    def get_zip(self, output_folder: str, zip_file_name: str):
+        """Write the in-memory zip to `output_folder` for callers that need a file on disk."""
+        return self._write_zip_file(self.get_zip_bytes(), output_folder, zip_file_name)
+
     def get_manual(self):
-        # This method should be overridden by subclasses to provide final output folder in zip
+        # This method should be overridden by subclasses to provide the manual as one markdown document
         raise NotImplementedError
 
-    def _render_template(self, template: WorkflowTemplate):
-        if not os.path.exists(template.template_output_dir):
-            os.makedirs(template.template_output_dir)
+    def get_manual_sections(self):
+        # This method should be overridden by subclasses to provide the manual as markdown, image and table sections
+        raise NotImplementedError
+
+    def _template_inputs(self, template: WorkflowTemplate) -> Dict:
+        if template.depends_on is None:
+            return self._template_data
+        return {key: self._template_data[key] for key in template.depends_on}
+
+    def _render_template(self, template: WorkflowTemplate) -> Tuple[str, str]:
+        """
+        Render the template and return its (archive path, content); nothing is written to disk.
 
+        The template only sees the data it declares in `depends_on`, and the output is reused
+        until that data changes.
+        """
         output_file_path = f"{template.template_output_dir}/{template.filled_file}"
-        # Setup Jinja environment and load template
-        template_loader = jinja2.FileSystemLoader(searchpath=template.template_dir)
-        template_env = jinja2.Environment(loader=template_loader)
-        template_jinja = template_env.get_template(template.template_file)
+        # Load the (already compiled) template from the shared Jinja environment; with auto reload
+        # an edited template file is a new object and therefore a new cache key
+        template_jinja = get_template_environment(template.template_dir).get_template(template.template_file)
+        inputs = self._template_inputs(template)
+
+        with span('generator.render', template=template.template_file, cache_hit=True) as fields:
+            key = (template_jinja, output_file_path, data_digest(inputs))
+            output = _render_cache.get(key)
+            if output is None:
+                fields['cache_hit'] = False
+                # Render the template with data
+                output = template_jinja.render(inputs)
+                _render_cache.set(key, output)
+        return output_file_path, output
+
+    def _cached_section(self, name: str, inputs: Any, build: Callable[[], Any]) -> Any:
+        """Return the output section `name`, built by `build` only when its `inputs` changed."""
+        with span('generator.manual_section', section=name, cache_hit=True) as fields:
+            key = (type(self).__name__, name, data_digest(inputs))
+            section = _render_cache.get(key)
+            if section is None:
+                fields['cache_hit'] = False
+                section = build()
+                _render_cache.set(key, section)
+        return section
+
+    def _generate(self) -> List[Tuple[str, str]]:
+        return [self._render_template(template) for template in self._templates]
+
+    @staticmethod
+    def _zip_entry(arc_name: str, executable: bool = False) -> zipfile.ZipInfo:
+        """Entry header with a fixed timestamp and permissions, so equal content gives byte-identical zips."""
+        info = zipfile.ZipInfo(arc_name, date_time=ZIP_DATE_TIME)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = ((0o100755 if executable else 0o100644) & 0xFFFF) << 16
+        return info
+
+    @classmethod
+    def _write_entries(cls, zf: zipfile.ZipFile, entries: List[Tuple[str, Union[str, bytes], bool]]):
+        for arc_name, content, executable in sorted(entries, key=lambda entry: entry[0]):
+            zf.writestr(cls._zip_entry(arc_name, executable), content)
+
+    @classmethod
+    def _create_zip_bytes(cls, files: List[Tuple[str, Union[str, bytes]]], directories: List[Tuple[str, str]]) -> bytes:
+        """
+        Build a reproducible zip archive in memory; entries are sorted by archive path.
 
-        # Render the template with data
-        output = template_jinja.render(self._template_data)
+        Args:
+            files: (archive path, content) pairs
+            directories: (source directory, archive directory) pairs, added recursively
+        """
+        entries = [(arc_name, content, False) for arc_name, content in files]
+        for source_dir, arc_dir in directories:
+            if not os.path.isdir(source_dir):
+                print(f"Path {source_dir} not found.")
+                continue
+            for dir_name, sub_dirs, file_names in os.walk(source_dir):
+                sub_dirs[:] = [d for d in sub_dirs if d not in IGNORED_DIRS]
+                for filename in file_names:
+                    file_path = os.path.join(dir_name, filename)
+                    arc_name = posixpath.join(arc_dir, Path(os.path.relpath(file_path, start=source_dir)).as_posix())
+                    with open(file_path, 'rb') as f:
+                        entries.append((arc_name, f.read(), bool(os.stat(file_path).st_mode & 0o111)))
 
-        # Save the rendered template to a file
-        with open(output_file_path, 'w') as f:
-            f.write(output)
+        with span('generator.zip_create', entries=len(entries)):
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+                cls._write_entries(zf, entries)
+        return buffer.getvalue()
 
-        print(f"Generated {output_file_path} successfully.")
-        return output_file_path
+    @classmethod
+    def _append_to_zip_bytes(cls, base_zip: bytes, files: List[Tuple[str, Union[str, bytes]]]) -> bytes:
+        """
+        Copy `base_zip` and append `files` (sorted, reproducible); entries already in the base zip are not
+        recompressed.
+        """
+        with span('generator.zip_append', entries=len(files)):
+            buffer = io.BytesIO(base_zip)
+            with zipfile.ZipFile(buffer, mode="a", compression=zipfile.ZIP_DEFLATED) as zf:
+                cls._write_entries(zf, [(arc_name, content, False) for arc_name, content in files])
+        return buffer.getvalue()
 
-    def _generate(self):
-        for template in self._templates:
-            self._generated_files.append(self._render_template(template))
-        return self._generated_files
+    @classmethod
+    def _cached_zip_bytes(cls, base_zip_digest: str, base_zip: bytes,
+                          files: List[Tuple[str, Union[str, bytes]]]) -> bytes:
+        """`_append_to_zip_bytes` reusing the archive while neither the base zip nor any entry changed."""
+        entries = tuple((arc_name, hashlib.sha256(content.encode('utf-8') if isinstance(content, str)
+                                                  else content).hexdigest())
+                        for arc_name, content in files)
+        key = (base_zip_digest, entries)
+        zip_bytes = _zip_cache.get(key)
+        if zip_bytes is None:
+            zip_bytes = cls._append_to_zip_bytes(base_zip, files)
+            _zip_cache.set(key, zip_bytes)
+        return zip_bytes
 
-    def _create_zip_file(self, paths_to_zip: List[str], zip_output_folder, zip_file_name):
+    def _write_zip_file(self, zip_bytes: bytes, zip_output_folder, zip_file_name):
         self._zip_file_name = zip_file_name
         self._zip_output_folder = zip_output_folder
         if not os.path.exists(self._zip_output_folder):
             os.makedirs(self._zip_output_folder)
 
         zip_file_path = os.path.join(self._zip_output_folder, self._zip_file_name)
-        print(f"Creating zip file: {zip_file_path}")
-
-        with zipfile.ZipFile(zip_file_path, mode="w") as zf:
-            for path in paths_to_zip:
-                if os.path.isdir(path):
-                    # Start the arcname from the base folder name
-                    base_folder_name = os.path.basename(path.rstrip(os.sep))
-                    for dir_name, sub_dirs, files in os.walk(path):
-                        for filename in files:
-                            file_path = os.path.join(dir_name, filename)
-                            # Build the arcname with the base folder name included
-                            arc_name = os.path.join(base_folder_name, os.path.relpath(file_path, start=path))
-                            zf.write(file_path, arc_name, compress_type=zipfile.ZIP_DEFLATED)
-                elif os.path.isfile(path):
-                    base_folder_name = os.path.basename(os.path.dirname(path))
-                    arc_name = os.path.join(base_folder_name, os.path.basename(path))
-                    zf.write(path, arc_name, compress_type=zipfile.ZIP_DEFLATED)
-                else:
-                    print(f"Path {path} not found.")
+        with open(zip_file_path, 'wb') as f:
+            f.write(zip_bytes)
         print(f"Zip file {zip_file_path} was created.")
         return zip_file_path, self._zip_file_name
@@ -0,0 +1,185 @@
+"""
+Headless batch generation of CI/CD workflows, without Streamlit or session state.
+
+Each repository is described by a JSON spec:
+
+    {
+        "name": "sales-repo",
+        "platform": "GitHub",
+        "stack": "connection.keboola.com",
+        "environments": [{"env_name": "dev", "branch": "main"}, {"env_name": "prod", "branch": "prod"}],
+        "projects": [
+            {
+                "project_name": "SALES",
+                "environments": {
+                    "dev": {"projectId": "123", "branchId": "456", "token": "...", "url": "..."},
+                    "prod": {"projectId": "789", "branchId": "012"}
+                }
+            }
+        ],
+        "options": {"cli_version": "2.25.0", "pull_max_parallel": 8, "push_matrix": true, "push_max_parallel": 8},
+        "output": "../sales-repo"
+    }
+
+`output` (relative to the spec file) is either a `.zip` file or a repository directory the generated files
+are extracted into. Without it, `<output-dir>/<name>.zip` is written. Optional `options` are passed to the
+platform generator. A project may list `depends_on`, the projects pushed before it.
+
+Usage:
+    python -m src.workflow_generator.batch specs/*.json --output-dir generated --workers 8
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+from .workflows import WorkflowGenerator, GITHUB_KEY
+
+ROOT_PATH = str(Path(__file__).resolve().parents[2])
+MANUAL_SUFFIX = '.manual.md'
+
+
+def load_spec(spec_path: str) -> Dict[str, Any]:
+    with open(spec_path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    for key in ('stack', 'environments'):
+        if key not in spec:
+            raise ValueError(f"Spec {spec_path} is missing '{key}'")
+    if 'projects' not in spec and 'project_mapping' not in spec:
+        raise ValueError(f"Spec {spec_path} is missing 'projects'")
+    return spec
+
+
+def spec_project_mapping(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Project mapping records in the shape WorkflowGenerator expects.
+
+    `project_mapping` (wide `{env_name}_<column>` records) is passed through; nested `projects` are flattened.
+    """
+    if 'project_mapping' in spec:
+        return spec['project_mapping']
+
+    records = []
+    for project in spec['projects']:
+        record = {'project_name': project['project_name']}
+        if project.get('depends_on'):
+            record['depends_on'] = list(project['depends_on'])
+        for env_name, binding in project.get('environments', {}).items():
+            for column, value in binding.items():
+                record[f'{env_name}_{column}'] = '' if value is None else str(value)
+        records.append(record)
+    return records
+
+
+def generate(spec: Dict[str, Any], root_path: str = ROOT_PATH) -> Tuple[bytes, str]:
+    """Generate the (zip bytes, manual) for one spec."""
+    generator = WorkflowGenerator(root_path, spec.get('platform', GITHUB_KEY), spec['stack'],
+                                  spec['environments'], spec_project_mapping(spec), spec.get('options'))
+    return generator.get_zip_bytes(), generator.get_manual()
+
+
+def resolve_output(spec_path: str, spec: Dict[str, Any], output_dir: Optional[str]) -> str:
+    if spec.get('output'):
+        return str(Path(spec_path).parent.joinpath(spec['output']))
+    if not output_dir:
+        raise ValueError(f"Spec {spec_path} has no 'output' and no --output-dir was given")
+    name = spec.get('name') or Path(spec_path).stem
+    return str(Path(output_dir).joinpath(f'{name}.zip'))
+
+
+def write_output(zip_bytes: bytes, output: str):
+    """
+    Write the zip file, or extract it into the `output` repository directory.
+
+    When extracting, existing top level files of the repository (e.g. its own .gitignore) are kept.
+    """
+    if output.endswith('.zip'):
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'wb') as f:
+            f.write(zip_bytes)
+        return
+
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+        names = zf.namelist()
+        # Drop the archive's single top level folder, so `.github/` lands in the repository root
+        roots = {name.split('/', 1)[0] for name in names}
+        prefix = f'{roots.pop()}/' if len(roots) == 1 and all('/' in name for name in names) else ''
+        for name in names:
+            if name.endswith('/'):
+                continue
+            relative_name = name[len(prefix):]
+            target = Path(output).joinpath(relative_name)
+            if '/' not in relative_name and target.exists():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(zf.read(name))
+
+
+def process_spec(spec_path: str, output_dir: Optional[str] = None, write_manual: bool = False) -> str:
+    """Generate and write the artifacts of one spec; returns the output path."""
+    spec = load_spec(spec_path)
+    output = resolve_output(spec_path, spec, output_dir)
+    zip_bytes, manual = generate(spec)
+    write_output(zip_bytes, output)
+    if write_manual:
+        manual_path = (output[:-len('.zip')] if output.endswith('.zip') else output.rstrip('/\\')) + MANUAL_SUFFIX
+        with open(manual_path, 'w', encoding='utf-8') as f:
+            f.write(manual)
+    return output
+
+
+def run_batch(spec_paths: List[str], output_dir: Optional[str] = None, workers: Optional[int] = None,
+              write_manual: bool = False) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Process the specs in parallel across processes.
+
+    Returns (spec path, output path, error) per spec; a failing spec does not stop the others.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_spec, spec_path, output_dir, write_manual): spec_path
+                   for spec_path in spec_paths}
+        for future in as_completed(futures):
+            spec_path = futures[future]
+            try:
+                results.append((spec_path, future.result(), None))
+            except Exception as e:
+                results.append((spec_path, None, f'{type(e).__name__}: {e}'))
+    return sorted(results)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Generate CI/CD workflows for many repositories')
+    parser.add_argument('specs', nargs='+', help='Repository spec JSON files')
+    parser.add_argument('--output-dir', help='Directory for <name>.zip of specs without an "output"')
+    parser.add_argument('--workers', type=int, default=None, help='Number of processes (default: CPU count)')
+    parser.add_argument('--timings', action='store_true',
+                        help='Log timing spans (rendering, zipping, ...) as JSON lines to stderr')
+    parser.add_argument('--manual', action='store_true',
+                        help=f'Also write the setup manual next to each output ({MANUAL_SUFFIX}); '
+                             f'it contains the tokens from the spec')
+    args = parser.parse_args(argv)
+    if args.timings:
+        # Worker processes inherit the configuration when forked
+        logging.basicConfig(level=logging.WARNING, format='%(message)s')
+        logging.getLogger('kbc.timing').setLevel(logging.DEBUG)
+
+    failed = 0
+    for spec_path, output, error in run_batch(args.specs, args.output_dir, args.workers, args.manual):
+        if error:
+            failed += 1
+            print(f'FAILED {spec_path}: {error}', file=sys.stderr)
+        else:
+            print(f'{spec_path} -> {output}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
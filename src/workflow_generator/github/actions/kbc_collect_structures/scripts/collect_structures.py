@@ -0,0 +1,39 @@
+"""
+Collect the vault keys and the storage structure of one project concurrently, in one process.
+
+Writes `<destination-dir>/vault/<destination-file>` and `<destination-dir>/storage/<destination-file>`, the
+layouts read by the vault and storage comparisons.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+ACTIONS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ACTIONS_DIR, 'kbc_vault_validation', 'get_vault_keys', 'scripts'))
+sys.path.insert(0, os.path.join(ACTIONS_DIR, 'kbc_storage_validation', 'get_storage_structure', 'scripts'))
+
+from storage_pull import StoragePull  # noqa: E402
+from vault_pull import VaultPull  # noqa: E402
+
+
+def collect(host, project_id, token, branch, destination_dir, destination_file):
+    vault_file = os.path.join(destination_dir, 'vault', destination_file)
+    storage_file = os.path.join(destination_dir, 'storage', destination_file)
+    # Each pull keeps its own session, requests sessions are not meant to be shared between threads
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        vault = executor.submit(lambda: VaultPull(host, token, branch, vault_file).pull())
+        storage = executor.submit(lambda: StoragePull(host, project_id, token, storage_file).pull())
+        return vault.result(), storage.result()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pull vault and storage structure from KBC')
+    parser.add_argument('--host', required=True, help='KBC host')
+    parser.add_argument('--project', required=True, help='KBC project id')
+    parser.add_argument('--token', required=True, help='KBC token')
+    parser.add_argument('--branch', required=True, help='KBC branch')
+    parser.add_argument('--destination-dir', required=True, help='Destination directory')
+    parser.add_argument('--destination-file', required=True, help='Destination file, relative to vault/ and storage/')
+    args = parser.parse_args()
+    collect(args.host, args.project, args.token, args.branch, args.destination_dir, args.destination_file)
@@ -0,0 +1,128 @@
+"""
+Lightweight fingerprint of a project, used to skip `kbc persist` and `kbc pull` when nothing changed.
+
+The fingerprint has two parts:
+- remote: configuration versions of the branch and the storage structure (bucket and table ids, columns),
+- local: the workdir files tracked or trackable by git, so that local edits are still overwritten by a pull.
+
+`check` compares the current fingerprint with the one saved by the last pull and writes the step outputs
+`unchanged` (true/false) and `remote`; `save` stores the fingerprint after a pull, reusing the remote part
+of `check`.
+
+Fingerprints are kept outside the project workdirs, in `.kbc_fingerprints/<workdir>.json`, so that saving one
+does not make the project look changed to the change-aware push.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+ACTIONS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ACTIONS_DIR, 'kbc_storage_validation', 'get_storage_structure', 'scripts'))
+
+# Same session, retry and timeout policy as the storage structure pull
+from storage_pull import TIMEOUT, create_session  # noqa: E402
+
+STATE_DIR = '.kbc_fingerprints'
+
+
+def _digest(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def remote_fingerprint(host, token, branch_id, session=None):
+    session = session or create_session()
+    base = host if host.startswith('https://') else ''.join(['https://', host])
+    head = {'X-StorageApi-Token': token}
+
+    def get(path, params=None):
+        response = session.get(url=''.join([base, path]), headers=head, params=params, timeout=TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    # Listing without `include` returns the configuration metadata only, the version changes with every edit
+    configurations = sorted(
+        (component['id'], configuration['id'], configuration.get('version'))
+        for component in get(f'/v2/storage/branch/{branch_id}/components')
+        for configuration in component.get('configurations', []))
+    tables = sorted(
+        (table['id'], table.get('columns', []))
+        for table in get(f'/v2/storage/branch/{branch_id}/tables', params={'include': 'columns'}))
+    buckets = sorted(bucket['id'] for bucket in get(f'/v2/storage/branch/{branch_id}/buckets'))
+    return _digest({'configurations': configurations, 'buckets': buckets, 'tables': tables})
+
+
+def state_file(workdir):
+    return os.path.join(STATE_DIR, f'{os.path.normpath(workdir)}.json')
+
+
+def local_fingerprint(workdir):
+    paths = subprocess.run(['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard', '--', workdir],
+                           check=True, capture_output=True, text=True).stdout.split('\0')
+    digest = hashlib.sha256()
+    for path in sorted(set(paths)):
+        if not path or not os.path.isfile(path):
+            continue
+        digest.update(path.encode('utf-8') + b'\0')
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def _load_state(workdir):
+    try:
+        with open(state_file(workdir), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_outputs(**outputs):
+    output_file = os.environ.get('GITHUB_OUTPUT')
+    if not output_file:
+        return
+    with open(output_file, 'a', encoding='utf-8') as f:
+        for name, value in outputs.items():
+            f.write(f'{name}={value}\n')
+
+
+def check(args):
+    state = {'remote': remote_fingerprint(args.host, args.token, args.branch),
+             'local': local_fingerprint(args.workdir)}
+    unchanged = state == _load_state(args.workdir)
+    print(f"Fingerprint of {args.workdir}: {'unchanged' if unchanged else 'changed'}")
+    _write_outputs(unchanged=str(unchanged).lower(), remote=state['remote'])
+
+
+def save(args):
+    state = {'remote': args.remote, 'local': local_fingerprint(args.workdir)}
+    path = state_file(args.workdir)
+    if state == _load_state(args.workdir):
+        print(f'Fingerprint in {path} is up to date')
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=4)
+    print(f'Fingerprint saved to {path}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Project fingerprint for skipping unchanged pulls')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    check_parser = subparsers.add_parser('check', help='Compare with the fingerprint of the last pull')
+    check_parser.add_argument('--host', required=True, help='KBC host')
+    check_parser.add_argument('--token', required=True, help='KBC token')
+    check_parser.add_argument('--branch', required=True, help='KBC branch id')
+    check_parser.add_argument('--workdir', required=True, help='Project working directory')
+    check_parser.set_defaults(handler=check)
+
+    save_parser = subparsers.add_parser('save', help='Store the fingerprint after a pull')
+    save_parser.add_argument('--remote', required=True, help='Remote fingerprint written by check')
+    save_parser.add_argument('--workdir', required=True, help='Project working directory')
+    save_parser.set_defaults(handler=save)
+
+    args = parser.parse_args()
+    args.handler(args)
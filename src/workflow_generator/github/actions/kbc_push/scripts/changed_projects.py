@@ -0,0 +1,55 @@
+"""
+Find the projects whose workdir changed since the last successful push to the environment.
+
+The last pushed commit is marked by the git tag MARKER_TAG. Without the tag, or with PUSH_ALL=true,
+every project is selected.
+
+Environment:
+    WAVES       JSON list of push waves, each a list of project names (= workdirs)
+    MARKER_TAG  tag of the last pushed commit, e.g. kbc-push/prod
+    PUSH_ALL    "true" to select every project
+
+Writes the step outputs `projects` (JSON list) and `wave_<n>` (JSON list per wave, 1-based).
+"""
+import json
+import os
+import subprocess
+
+
+def fetch_marker(tag):
+    # A depth of one is enough, git diff only needs the trees of both commits
+    result = subprocess.run(['git', 'fetch', '--no-tags', '--depth=1', 'origin', f'+refs/tags/{tag}:refs/tags/{tag}'],
+                            capture_output=True, text=True)
+    return result.returncode == 0
+
+
+def changed_top_level_dirs(tag):
+    output = subprocess.run(['git', 'diff', '--name-only', '-z', tag, 'HEAD'],
+                            check=True, capture_output=True, text=True).stdout
+    return {path.split('/', 1)[0] for path in output.split('\0') if '/' in path}
+
+
+def main():
+    waves = json.loads(os.environ['WAVES'])
+    tag = os.environ['MARKER_TAG']
+    projects = [project for wave in waves for project in wave]
+
+    if os.environ.get('PUSH_ALL', '').lower() == 'true':
+        print('Push of all projects requested')
+        selected = set(projects)
+    elif not fetch_marker(tag):
+        print(f'No {tag} tag found, pushing all projects')
+        selected = set(projects)
+    else:
+        changed = changed_top_level_dirs(tag)
+        selected = {project for project in projects if project in changed}
+        print(f'Changed since {tag}: {", ".join(sorted(selected)) or "no project"}')
+
+    with open(os.environ['GITHUB_OUTPUT'], 'a', encoding='utf-8') as f:
+        f.write(f'projects={json.dumps([project for project in projects if project in selected])}\n')
+        for index, wave in enumerate(waves, start=1):
+            f.write(f'wave_{index}={json.dumps([project for project in wave if project in selected])}\n')
+
+
+if __name__ == '__main__':
+    main()
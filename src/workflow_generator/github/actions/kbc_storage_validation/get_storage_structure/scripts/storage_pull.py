@@ -2,15 +2,31 @@ import json
 import os
 import requests
 import argparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (3.05, 60)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session(retries=3, backoff_factor=0.5):
+    """Keep-alive session retrying idempotent requests with backoff on 429/5xx."""
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUS_CODES,
+                  allowed_methods=frozenset(['GET']), raise_on_status=False)
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(max_retries=retry))
+    return session
 
 
 class StoragePull:
-    def __init__(self, host, project_id, token, destination_file):
+    def __init__(self, host, project_id, token, destination_file, session=None):
         self._base = self._base_uni(host)
         self._project_id = project_id
         self._token = token
         self._head = {'X-StorageApi-Token': self._token}
         self._destination_file = destination_file
+        self._session = session or create_session()
 
     @staticmethod
     def _base_uni(host):
@@ -18,19 +34,21 @@ class StoragePull:
             return ''.join(['https://', host])
         return host
 
+    def _get(self, path, params=None):
+        response = self._session.get(url=''.join([self._base, path]), headers=self._head, params=params,
+                                     timeout=TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
     def _get_branches(self):
-        branches = requests.get(url=''.join([self._base, '/v2/storage/dev-branches']), headers=self._head)
-        return branches.json()
+        return self._get('/v2/storage/dev-branches')
 
     def _get_buckets(self):
-        buckets = requests.get(url=''.join([self._base, '/v2/storage/buckets']), headers=self._head,
-                               params={'include': 'metadata'})
-        return buckets.json()
+        return self._get('/v2/storage/buckets', params={'include': 'metadata'})
 
     def _get_tables(self, bucket_id):
-        tables = requests.get(url=''.join([self._base, f'/v2/storage/buckets/{bucket_id}/tables']), headers=self._head,
-                              params={'include': 'columns,metadata,columnMetadata'})
-        return tables.json()
+        return self._get(f'/v2/storage/buckets/{bucket_id}/tables',
+                         params={'include': 'columns,metadata,columnMetadata'})
 
     def pull(self):
         # create whole tree if not exists
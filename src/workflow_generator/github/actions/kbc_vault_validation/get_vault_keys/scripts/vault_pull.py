@@ -4,13 +4,29 @@ import os
 
 import requests
 import argparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (3.05, 60)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session(retries=3, backoff_factor=0.5):
+    """Keep-alive session retrying idempotent requests with backoff on 429/5xx."""
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUS_CODES,
+                  allowed_methods=frozenset(['GET']), raise_on_status=False)
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(max_retries=retry))
+    return session
 
 
 class VaultPull:
-    def __init__(self, host, token, branch, destination_file):
+    def __init__(self, host, token, branch, destination_file, session=None):
         self._base = self._base_uni(host)
         self._token = token
         self._head = {'X-StorageApi-Token': self._token}
+        self._session = session or create_session()
         self._branch = self._get_branch(branch)
         self._destination_file = destination_file
 
@@ -27,15 +43,20 @@ class VaultPull:
             return branch
         else:
             logging.info(f'Branch {branch} is empty or is not digit, get default branch from KBC')
-            branches = requests.get(url=''.join([self._base, '/v2/storage/dev-branches/']), headers=self._head)
-            default_branch = [b['id'] for b in branches.json() if b['isDefault']][0]
+            branches = self._get(''.join([self._base, '/v2/storage/dev-branches/']))
+            default_branch = [b['id'] for b in branches if b['isDefault']][0]
             logging.info(f'Using default branch ({default_branch})')
             return default_branch
 
     def _get_vault_keys(self):
         url = self._base.replace('connection', 'vault')
-        keys = requests.get(url=''.join([url, '/variables/scoped/branch/', str(self._branch)]), headers=self._head)
-        return [k['key'] for k in keys.json()]
+        keys = self._get(''.join([url, '/variables/scoped/branch/', str(self._branch)]))
+        return [k['key'] for k in keys]
+
+    def _get(self, url):
+        response = self._session.get(url=url, headers=self._head, timeout=TIMEOUT)
+        response.raise_for_status()
+        return response.json()
 
     def _save_vault_structure(self, structure):
         # create whole tree if not exists
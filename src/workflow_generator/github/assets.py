@@ -0,0 +1,63 @@
+import functools
+import hashlib
+from pathlib import Path
+
+from ..base.manual import ImageSection
+from ..base.workflow_generator import WorkflowGeneratorBase
+from ...utils.timing import span
+
+MANUAL_FILES_DIR = "src/workflow_generator/github/_manual_files"
+ACTIONS_DIR = "src/workflow_generator/github/actions"
+GITIGNORE_FILE = "src/workflow_generator/github/_additional_files/.gitignore"
+
+MANUAL_TEMPLATE_FILE = "github_manual.md"
+# Manual template block -> (image file, alt text, width)
+MANUAL_IMAGES = {
+    "git_action_img": ("git_action.png", "action", 450),
+    "git_env_setup_img": ("git_env_setup.png", "git_env_setup_img_path", 600),
+    "branch_protection_img": ("branch_protection.png", "branch_protection_img_path", 600)
+}
+
+# Layout of the generated zip archive
+ZIP_ROOT_DIR = "generated_files"
+ZIP_WORKFLOWS_DIR = f"{ZIP_ROOT_DIR}/.github/workflows"
+ZIP_ACTIONS_DIR = f"{ZIP_ROOT_DIR}/.github/actions"
+ZIP_GITIGNORE_FILE = f"{ZIP_ROOT_DIR}/.gitignore"
+
+
+class GithubAssets:
+    """
+    Static inputs of the GitHub generator: the manual template, the manual image sections
+    and a zip holding the already compressed actions tree and .gitignore.
+
+    They never change while the app runs, so they are loaded once per process (see `get_assets`)
+    and every generation only adds its rendered workflow files.
+    """
+    manual_template: str
+    images: dict[str, ImageSection]
+    base_zip: bytes
+    base_zip_digest: str
+
+    def __init__(self, root_path: str):
+        root = Path(root_path)
+        manual_files_path = root.joinpath(MANUAL_FILES_DIR)
+
+        with open(manual_files_path.joinpath(MANUAL_TEMPLATE_FILE), "r") as f:
+            self.manual_template = f.read()
+        self.images = {block: ImageSection(manual_files_path.joinpath(file_name).as_posix(), alt, width)
+                       for block, (file_name, alt, width) in MANUAL_IMAGES.items()}
+
+        with open(root.joinpath(GITIGNORE_FILE), "rb") as f:
+            gitignore = f.read()
+        self.base_zip = WorkflowGeneratorBase._create_zip_bytes(
+            [(ZIP_GITIGNORE_FILE, gitignore)],
+            [(root.joinpath(ACTIONS_DIR).as_posix(), ZIP_ACTIONS_DIR)]
+        )
+        self.base_zip_digest = hashlib.sha256(self.base_zip).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def get_assets(root_path: str) -> GithubAssets:
+    """Process-wide asset bundle for `root_path`, loaded on first use."""
+    with span('github.load_assets'):
+        return GithubAssets(root_path)
@@ -1,43 +1,80 @@
-import base64
-import os
-import shutil
 from pathlib import Path
+from typing import List, Optional
 
-from ..base.workflow_generator import WorkflowGeneratorBase, WorkflowTemplate
+from ..base.manual import ManualSection, TableSection, manual_to_markdown, split_manual_template
+from ..base.workflow_generator import WorkflowGeneratorBase, WorkflowTemplate, data_digest
+from ...utils.dependencies import dependency_waves
+from ...utils.timing import span
+from .assets import get_assets, ZIP_WORKFLOWS_DIR
 
 TEMPLATES_DIR = "src/workflow_generator/github/_templates"
-MANUAL_FILES_DIR = "src/workflow_generator/github/_manual_files"
-TEMPLATE_OUTPUT_DIR = "src/workflow_generator/github/workflows"
-ACTIONS_DIR = "src/workflow_generator/github/actions"
-GITIGNORE_FILE = "src/workflow_generator/github/_additional_files/.gitignore"
-OUTPUT_DIR = "src/workflow_generator/github/generated_files"
 
-# Define template configurations
+# Concurrent per-project pull jobs; None or 0 lets GitHub run all of them at once
+DEFAULT_PULL_MAX_PARALLEL = 10
+# Concurrent per-project push jobs within one dependency wave
+DEFAULT_PUSH_MAX_PARALLEL = 10
+# GitHub limits a matrix to 256 jobs; larger fleets (or push waves) run sequentially in a single job
+MAX_MATRIX_JOBS = 256
+
+# Define template configurations; depends_on lists the template data each workflow is rendered from
 templates = [
-    {"template_file": "KBC_pull_all.yml.jinja", "filled_file": "KBC_pull_all.yml"},
-    {"template_file": "KBC_push_all.yml.jinja", "filled_file": "KBC_push_all.yml"}
+    {"template_file": "KBC_pull_all.yml.jinja", "filled_file": "KBC_pull_all.yml",
+     "depends_on": ("projects", "environment_spec", "steps", "environment_names", "project_names", "pull_matrix",
+                    "pull_max_parallel", "structures_matrix", "cli_version")},
+    {"template_file": "KBC_push_all.yml.jinja", "filled_file": "KBC_push_all.yml",
+     "depends_on": ("projects", "environment_spec", "push_waves", "push_wave_names", "push_matrix",
+                    "push_max_parallel", "cli_version")}
 ]
 
 
 class GithubGenerator(WorkflowGeneratorBase):
 
-    def __init__(self, root_path: str, stack: str, environments: dict[object], project_mapping: dict[object]):
+    def __init__(self, root_path: str, stack: str, environments: dict[object], project_mapping: dict[object],
+                 pull_max_parallel: Optional[int] = DEFAULT_PULL_MAX_PARALLEL, push_matrix: bool = False,
+                 push_max_parallel: Optional[int] = DEFAULT_PUSH_MAX_PARALLEL, cli_version: Optional[str] = None):
+        """
+        Args:
+            pull_max_parallel: concurrent per-project pull jobs, None or 0 for no limit
+            push_matrix: push each dependency wave of projects as a matrix of parallel jobs instead of
+                pushing all projects sequentially in one job
+            push_max_parallel: concurrent push jobs within a wave, None or 0 for no limit
+            cli_version: Keboola CLI version installed by the workflows (e.g. "2.25.0"); when empty, the
+                latest release is resolved once per workflow run
+        """
         self._root_path = root_path
         self._stack = stack
         self._projects = [project['project_name'] for project in project_mapping]
+        self._depends_on = {project['project_name']: project.get('depends_on') or [] for project in project_mapping}
         self._environments = environments
-        self._project_mapping = self._transform_mapping(project_mapping)
-
-        self._template_data = {
-            "projects": f"{', '.join(self._projects)}",
-            "environment_spec": self._generate_environment_spec(),
-            "steps": self._generate_steps(),
-            "environment_names": [environment['env_name'] for environment in self._environments]
-        }
+        with span('github.template_data', projects=len(self._projects), environments=len(environments)):
+            self._project_mapping = self._transform_mapping(project_mapping)
+
+            steps = self._generate_steps()
+            push_waves = self._generate_push_waves(steps)
+            self._template_data = {
+                "projects": f"{', '.join(self._projects)}",
+                "environment_spec": self._generate_environment_spec(),
+                "steps": steps,
+                "environment_names": [environment['env_name'] for environment in self._environments],
+                # Pull fans out to one job per project, merged into one commit by the Pull_All job
+                "project_names": self._projects,
+                "pull_matrix": len(self._projects) <= MAX_MATRIX_JOBS,
+                # One structures collection job per (origin, project)
+                "structures_matrix": 2 * len(self._projects) <= MAX_MATRIX_JOBS,
+                "pull_max_parallel": pull_max_parallel or None,
+                # Push runs in dependency order; the projects of one wave are independent of each other
+                "push_waves": push_waves,
+                "push_wave_names": [[step['name'] for step in wave] for wave in push_waves],
+                "push_matrix": push_matrix and all(len(wave) <= MAX_MATRIX_JOBS for wave in push_waves),
+                "push_max_parallel": push_max_parallel or None,
+                # The CLI binary is cached per version, so every job of a run must install the same one
+                "cli_version": (cli_version or '').strip().lstrip('v') or None
+            }
         self._templates = [
             WorkflowTemplate(self._add_root_path(TEMPLATES_DIR), template['template_file'],
-                             self._add_root_path(TEMPLATE_OUTPUT_DIR),
-                             template['filled_file']) for
+                             ZIP_WORKFLOWS_DIR,
+                             template['filled_file'],
+                             template['depends_on']) for
             template
             in templates]
         super().__init__(root_path, self._template_data, self._templates)
@@ -77,141 +114,87 @@ class GithubGenerator(WorkflowGeneratorBase):
     def _get_env_md_list(self):
         return '\n    - ' + '\n    - '.join([f"**{environment['env_name']}**" for environment in self._environments])
 
-    def _get_env_secrets_table_md(self) -> str:
-        table_elements = []
-        # Add style for copy functionality
-        table_elements.append("""
-<style>
-.copy-value {
-    user-select: all;
-    cursor: pointer;
-}
-.copy-value:active {
-    background-color: #e0e0e0;
-}
-</style>
-""")
-        
-        # Hlavička s Environment jako prvním sloupcem
-        table_elements.append("| Environment | Secret | Value |\n")
-        table_elements.append("| --- | --- | --- |\n")
-        
+    def _get_env_secrets_table(self) -> TableSection:
+        rows_by_env = {}
         # Seřadíme prostředí podle názvu
-        sorted_environments = sorted(self._environments, key=lambda x: x['env_name'])
-        
-        # Pro každé prostředí a projekt vytvoříme samostatný řádek
-        for environment in sorted_environments:
-            for project in sorted(self._projects):
-                secret_name = f"KBC_SAPI_TOKEN_{project}"
-                secret_value = self._project_mapping[project][environment['env_name']]['token']
-                table_elements.append(
-                    f"| {environment['env_name']} | "
-                    f"<span class='copy-value'>{secret_name}</span> | "
-                    f"<code class='copy-value'>{secret_value}</code> |\n")
-
-        return ''.join(table_elements)
-
-    def _get_env_variables_table_md(self) -> str:
-        table_elements = []
-        table_elements.append("""
-<style>
-.copy-value {
-    user-select: all;
-    cursor: pointer;
-}
-.copy-value:active {
-    background-color: #e0e0e0;
-}
-</style>
-""")
-        
-        # Hlavička s Environment jako prvním sloupcem
-        table_elements.append("| Environment | Variable | Value |\n")
-        table_elements.append("| --- | --- | --- |\n")
-
+        for environment in sorted(self._environments, key=lambda x: x['env_name']):
+            # Pro každé prostředí a projekt vytvoříme samostatný řádek
+            rows_by_env[environment['env_name']] = [
+                (f"KBC_SAPI_TOKEN_{project}", self._project_mapping[project][environment['env_name']]['token'])
+                for project in sorted(self._projects)]
+        return TableSection('Secret', rows_by_env)
+
+    def _get_env_variables_table(self) -> TableSection:
+        rows_by_env = {}
         # Seřadíme prostředí podle názvu
-        sorted_environments = sorted(self._environments, key=lambda x: x['env_name'])
-
-        # Pro každé prostředí přidáme všechny proměnné
-        for environment in sorted_environments:
+        for environment in sorted(self._environments, key=lambda x: x['env_name']):
             # KBC_SAPI_HOST pro každé prostředí
-            var_name = f"KBC_SAPI_HOST"
-            value = self._stack
-            table_elements.append(
-                f"| {environment['env_name']} | "
-                f"<span class='copy-value'>{var_name}</span> | "
-                f"<code class='copy-value'>{value}</code> |\n"
-            )
-            
+            rows = [("KBC_SAPI_HOST", self._stack)]
             # Project ID a Branch ID pro každý projekt
             for project in sorted(self._projects):
-                # Project ID
-                var_name = f"KBC_PROJECT_ID_{project}"
-                value = self._project_mapping[project][environment['env_name']]['id']
-                table_elements.append(
-                    f"| {environment['env_name']} | "
-                    f"<span class='copy-value'>{var_name}</span> | "
-                    f"<code class='copy-value'>{value}</code> |\n"
-                )
-                
-                # Branch ID
-                var_name = f"KBC_BRANCH_ID_{project}"
-                value = self._project_mapping[project][environment['env_name']]['branchId']
-                table_elements.append(
-                    f"| {environment['env_name']} | "
-                    f"<span class='copy-value'>{var_name}</span> | "
-                    f"<code class='copy-value'>{value}</code> |\n"
-                )
-
-        return ''.join(table_elements)
+                project_env = self._project_mapping[project][environment['env_name']]
+                rows.append((f"KBC_PROJECT_ID_{project}", project_env['id']))
+                rows.append((f"KBC_BRANCH_ID_{project}", project_env['branchId']))
+            rows_by_env[environment['env_name']] = rows
+        return TableSection('Variable', rows_by_env)
 
     def _get_branch_table_md(self) -> str:
         return '\n    - ' + '\n    - '.join([f"`git checkout -b {str(environment['branch'])}`"
                                       for environment in self._environments])
 
-    def get_manual(self):
-        manual_files_path = self._add_root_path(MANUAL_FILES_DIR)
-        manual_template = open(Path(manual_files_path + "/github_manual.md"), "r").read()
-        images = {
-            "git_action_img_path": self._get_image_base64(Path(manual_files_path + "/git_action.png")),
-            "git_env_setup_img_path": self._get_image_base64(Path(manual_files_path + "/git_env_setup.png")),
-            "branch_protection_img_path": self._get_image_base64(Path(manual_files_path + "/branch_protection.png"))
-        }
-
-        manual = manual_template.format(env_list=self._get_env_md_list(),
-                                        env_secrets_table=self._get_env_secrets_table_md(),
-                                        env_variables_table=self._get_env_variables_table_md(),
-                                        branch_table=self._get_branch_table_md(),
-                                        **images)
-        return manual
-
-    @staticmethod
-    def _get_image_base64(image_path):
-        with open(image_path, "rb") as img_file:
-            b64_string = base64.b64encode(img_file.read()).decode()
-        return b64_string
+    def _env_names(self) -> list:
+        return [environment['env_name'] for environment in self._environments]
 
-    def get_zip(self, output_dir: str, zip_name: str):
-        self._generate()
-        folder_to_zip = f'{self._add_root_path(OUTPUT_DIR)}/'
-        destination_folder = f'{folder_to_zip}.github/'
+    def _mapping_values(self, key: str) -> dict:
+        return {project: {env_name: self._project_mapping[project][env_name][key] for env_name in self._env_names()}
+                for project in self._projects}
 
-        if os.path.exists(destination_folder):
-            shutil.rmtree(destination_folder)
-
-        os.makedirs(destination_folder)
+    def get_manual_sections(self) -> List[ManualSection]:
+        """
+        The manual as sections: markdown text, images and per-environment tables.
 
-        shutil.copy(self._add_root_path(GITIGNORE_FILE), folder_to_zip)
+        Each section is rebuilt only when the data it shows changed, e.g. a new token only
+        rebuilds the secrets table.
+        """
+        with span('github.manual_sections'):
+            return self._build_manual_sections()
+
+    def _build_manual_sections(self) -> List[ManualSection]:
+        assets = get_assets(self._root_path)
+        env_names = self._env_names()
+        fields = {
+            "env_list": self._cached_section('env_list', env_names, self._get_env_md_list),
+            "branch_table": self._cached_section(
+                'branch_table', [environment['branch'] for environment in self._environments],
+                self._get_branch_table_md)
+        }
+        blocks = {
+            "env_secrets_table": self._cached_section(
+                'env_secrets_table', [env_names, self._mapping_values('token')], self._get_env_secrets_table),
+            "env_variables_table": self._cached_section(
+                'env_variables_table',
+                [self._stack, env_names, self._mapping_values('id'), self._mapping_values('branchId')],
+                self._get_env_variables_table),
+            **assets.images
+        }
+        return split_manual_template(assets.manual_template, fields, blocks)
 
-        for source_folder in [self._add_root_path(TEMPLATE_OUTPUT_DIR), self._add_root_path(ACTIONS_DIR)]:
-            if os.path.exists(source_folder):
-                folder_name = os.path.basename(source_folder)
+    def get_manual(self) -> str:
+        return manual_to_markdown(self.get_manual_sections())
 
-                destination_path = os.path.join(destination_folder, folder_name)
+    def get_zip_bytes(self) -> bytes:
+        """
+        Append the rendered workflows to the preloaded zip of the static actions and .gitignore.
 
-                shutil.copytree(source_folder, destination_path, dirs_exist_ok=True)
+        The archive is reused as long as no rendered workflow changed.
+        """
+        with span('github.zip'):
+            assets = get_assets(self._root_path)
+            return self._cached_zip_bytes(assets.base_zip_digest, assets.base_zip, self._generate())
 
-        return self._create_zip_file([folder_to_zip], output_dir, zip_name)
+    def get_zip_key(self) -> str:
+        """Digest of the static assets, the templates and their inputs; tokens do not affect it."""
+        return data_digest([get_assets(self._root_path).base_zip_digest, self._templates_fingerprint()])
 
     def _generate_environment_spec(self):
         """
@@ -231,6 +214,12 @@ class GithubGenerator(WorkflowGeneratorBase):
         environment_spec += " }}"
         return environment_spec
 
+    def _generate_push_waves(self, steps: list) -> list:
+        """The steps grouped into waves, each wave after the waves of the projects it depends on."""
+        steps_by_project = {step['name']: step for step in steps}
+        return [[steps_by_project[project] for project in wave]
+                for wave in dependency_waves(self._projects, self._depends_on)]
+
     def _generate_steps(self):
         """
         Generates steps for Pull or Push operations based on the projects and operation type specified.
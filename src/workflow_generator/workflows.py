@@ -1,8 +1,23 @@
-from .base.workflow_generator import WorkflowGeneratorBase
+from typing import Optional
+
+from .base.manual import ManualSection, manual_to_markdown
+from .base.workflow_generator import WorkflowGeneratorBase, data_digest
 from .github.github_generator import GithubGenerator
+from ..utils.artifact_store import get_artifact_store
+from ..utils.timing import span
+from ..utils.ttl_cache import TTLCache
 
 GITHUB_KEY = 'GitHub'
-OUTPUT_DIR = "/OUTPUT"
+ARTIFACT_CACHE_SIZE = 32
+
+# Generated (zip bytes, zip key, zip file name, manual sections) keyed by the configuration digest
+_artifact_cache = TTLCache(max_size=ARTIFACT_CACHE_SIZE, ttl=None)
+
+
+def config_digest(platform: str, stack: str, environments: list[dict], project_mapping: list[dict],
+                  options: Optional[dict] = None) -> str:
+    """Stable digest of the generator inputs; equal configurations produce equal digests."""
+    return data_digest([platform, stack, environments, project_mapping, options or {}])
 
 
 class WorkflowGenerator:
@@ -11,25 +26,83 @@ class WorkflowGenerator:
     _project_mapping: dict[object]
     _generator: WorkflowGeneratorBase
 
-    def __init__(self, root_path: str, platform: str, stack:str, environments: dict[object], project_mapping: dict[object]):
+    def __init__(self, root_path: str, platform: str, stack:str, environments: dict[object], project_mapping: dict[object],
+                 options: Optional[dict] = None):
+        """
+        Args:
+            options: platform specific generator options, e.g. `pull_max_parallel` for GitHub
+        """
         self._platform = platform
         self._root_path = root_path
         self._stack = stack
         self._environments = environments
         self._project_mapping = project_mapping
-        self._generator = self._get_generator()
-        self._zip_file = self._generator.get_zip(f"{self._root_path}.{OUTPUT_DIR}", f"{self._platform}_workflows.zip")
-        self._manual = self._generator.get_manual()
+        self._options = options or {}
+        self._digest = config_digest(platform, stack, environments, project_mapping, self._options)
+
+        with span('workflows.generate', platform=platform, cache_hit=True) as fields:
+            cached = _artifact_cache.get(self._digest)
+            if cached is None:
+                fields['cache_hit'] = False
+                cached = self._build()
+                _artifact_cache.set(self._digest, cached)
+        self._zip_bytes, self._zip_key, self._zip_file_name, self._manual_sections = cached
+
+    def _build(self):
+        generator = self._get_generator()
+        zip_key = generator.get_zip_key()
+        return (self._load_zip_bytes(generator, zip_key), zip_key, f"{self._platform}_workflows.zip",
+                generator.get_manual_sections())
 
-    def get_zip_file(self):
-        return self._zip_file
+    @staticmethod
+    def _load_zip_bytes(generator: WorkflowGeneratorBase, zip_key: str) -> bytes:
+        """
+        Zip bytes from the artifact store shared by all worker processes, generated and stored on a miss.
+
+        Zips are reproducible, so configurations differing only in tokens share one stored artifact.
+        """
+        store = get_artifact_store()
+        if store is None:
+            return generator.get_zip_bytes()
+        with span('artifact_store.get') as fields:
+            try:
+                zip_bytes = store.get(zip_key)
+            except OSError:
+                zip_bytes = None
+            fields['hit'] = zip_bytes is not None
+        if zip_bytes is None:
+            zip_bytes = generator.get_zip_bytes()
+            with span('artifact_store.put', size=len(zip_bytes)):
+                try:
+                    store.put(zip_key, zip_bytes)
+                except OSError as e:
+                    print(f"Artifact store is not writable: {e}")
+        return zip_bytes
+
+    def get_digest(self) -> str:
+        return self._digest
+
+    def get_zip_bytes(self) -> bytes:
+        return self._zip_bytes
+
+    def get_etag(self) -> str:
+        """Strong ETag of the zip; equal for byte-identical zips."""
+        return f'"{self._zip_key}"'
+
+    def get_zip_file_name(self) -> str:
+        return self._zip_file_name
 
     def get_manual(self) -> str:
-        """Get manual for setting up the workflow"""
-        return self._manual
+        """Get manual for setting up the workflow as one markdown document with inlined images"""
+        return manual_to_markdown(self._manual_sections)
+
+    def get_manual_sections(self) -> list[ManualSection]:
+        """Get manual for setting up the workflow as markdown, image and table sections"""
+        return self._manual_sections
 
     def _get_generator(self) -> WorkflowGeneratorBase:
         if self._platform == GITHUB_KEY:
-            return GithubGenerator(self._root_path, self._stack, self._environments, self._project_mapping)
+            return GithubGenerator(self._root_path, self._stack, self._environments, self._project_mapping,
+                                   **self._options)
         else:
             raise ValueError(f"Unsupported platform yet...({self._platform})")